@@ -1,8 +1,18 @@
 from typing import Any, Dict, Optional, Tuple
 import jwt
 from datetime import datetime, timezone, timedelta
+import asyncio
+import base64
 import hashlib
-from fastapi import HTTPException
+import hmac
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import Cookie, HTTPException
+
+from app.cache import TTLCache
+from app.config import settings
 
 
 class VerificationFailedError(HTTPException):
@@ -10,7 +20,14 @@ class VerificationFailedError(HTTPException):
         super().__init__(401, text)
 
 
-def generate_token(user_id: int, expire_time: int = 60) -> str:
+def key_id(secret: str) -> str:
+    # 토큰 헤더에 넣을 키 식별자. 키 자체는 노출하지 않음
+    return hashlib.sha256(secret.encode()).hexdigest()[:16]
+
+
+def generate_token(user_id: int, expire_time: Optional[int] = None) -> str:
+    if expire_time is None:
+        expire_time = settings.jwt_expire_minutes
     current_dt = datetime.now(tz=timezone.utc)
     token = jwt.encode(
         {
@@ -19,28 +36,123 @@ def generate_token(user_id: int, expire_time: int = 60) -> str:
             "exp": current_dt + timedelta(minutes=expire_time),
             "user_id": user_id,
         },
-        "ms_key",
-        algorithm="HS256",
+        settings.jwt_secret,
+        algorithm=settings.jwt_algorithm,
+        headers={"kid": key_id(settings.jwt_secret)},
     )
     # Todo: 차후 그룹 정보도 함께 넣는 것을 고려
     return token
 
 
+# 검증에 성공한 토큰의 해시 -> user_id. 항목은 토큰의 exp까지만 유지됨
+verified_token_cache = TTLCache(maxsize=settings.jwt_cache_size, ttl=settings.jwt_expire_minutes * 60)
+
+
+def _decode_token(token: str) -> Dict[str, Any]:
+    secrets = settings.jwt_verification_secrets
+    kid = jwt.get_unverified_header(token).get("kid")
+    matched = [secret for secret in secrets if key_id(secret) == kid]
+    # kid가 없는 이전 토큰은 모든 키로 시도
+    for secret in matched or secrets:
+        try:
+            return jwt.decode(token, key=secret, algorithms=[settings.jwt_algorithm])
+        except jwt.InvalidSignatureError:
+            continue
+    raise jwt.InvalidSignatureError("Signature verification failed")
+
+
 def verify_token(token: Optional[str]) -> int:
     user_id = -1
     if token is None:
         raise VerificationFailedError("No Token")
 
+    token_hash = hashlib.sha256(token.encode()).digest()
+    cached = verified_token_cache.get(token_hash)
+    if cached is not None:
+        return cached
+
     try:
-        decoded_token = jwt.decode(token, key="ms_key", algorithms=["HS256"])
+        decoded_token = _decode_token(token)
         user_id = decoded_token["user_id"]
-    except jwt.InvalidSignatureError:
-        raise VerificationFailedError("Token not valid")
     except jwt.ExpiredSignatureError:
         raise VerificationFailedError("Token expired")
+    except (jwt.InvalidTokenError, KeyError):
+        raise VerificationFailedError("Token not valid")
+
+    remaining = decoded_token["exp"] - time.time()
+    if remaining > 0:
+        verified_token_cache.set(token_hash, user_id, ttl=remaining)
 
     return user_id
 
 
+def get_current_user_id(token: Optional[str] = Cookie(None)) -> int:
+    """쿠키의 토큰을 검증하고 사용자 ID를 반환하는 의존성입니다. 한 요청 안에서는 한 번만 실행됩니다."""
+    return verify_token(token)
+
+
+def _b64encode(value: bytes) -> str:
+    return base64.b64encode(value).decode()
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * r * n + 1024 * 1024, dklen=32)
+
+
+def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+
+
 def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+    """설정된 방식으로 비밀번호를 해시합니다. 결과에는 방식, 비용, salt가 함께 저장됩니다.
+
+    CPU를 많이 사용하므로 API에서는 hash_password_async를 사용합니다.
+    """
+    salt = secrets.token_bytes(16)
+    if settings.password_scheme == "pbkdf2_sha256":
+        iterations = settings.pbkdf2_iterations
+        return f"pbkdf2_sha256${iterations}${_b64encode(salt)}${_b64encode(_pbkdf2(password, salt, iterations))}"
+
+    n, r, p = settings.scrypt_n, settings.scrypt_r, settings.scrypt_p
+    return f"scrypt${n}${r}${p}${_b64encode(salt)}${_b64encode(_scrypt(password, salt, n, r, p))}"
+
+
+def verify_password(password: str, password_hash: str) -> Tuple[bool, bool]:
+    """비밀번호를 확인합니다.
+
+    Returns:
+        Tuple[bool, bool]: (일치 여부, 현재 설정으로 다시 해시해야 하는지 여부). 예전 SHA-256 해시는 일치하면 항상 다시 해시합니다.
+    """
+    parts = password_hash.split("$")
+    if parts[0] == "scrypt" and len(parts) == 6:
+        n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+        expected = base64.b64decode(parts[5])
+        matched = hmac.compare_digest(_scrypt(password, base64.b64decode(parts[4]), n, r, p), expected)
+        current = settings.password_scheme == "scrypt" and (n, r, p) == (settings.scrypt_n, settings.scrypt_r, settings.scrypt_p)
+        return matched, matched and not current
+
+    if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+        iterations = int(parts[1])
+        expected = base64.b64decode(parts[3])
+        matched = hmac.compare_digest(_pbkdf2(password, base64.b64decode(parts[2]), iterations), expected)
+        current = settings.password_scheme == "pbkdf2_sha256" and iterations == settings.pbkdf2_iterations
+        return matched, matched and not current
+
+    # salt 없이 SHA-256 한 번만 적용했던 예전 해시
+    legacy = hashlib.sha256(password.encode()).hexdigest()
+    matched = hmac.compare_digest(legacy, password_hash)
+    return matched, matched
+
+
+# 해시 계산은 CPU를 오래 사용하므로 이벤트 루프나 요청 처리 스레드가 아닌 별도 스레드에서 제한된 수만큼만 실행
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers or os.cpu_count() or 1, thread_name_prefix="password-hash"
+)
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(password_executor, hash_password, password)
+
+
+async def verify_password_async(password: str, password_hash: str) -> Tuple[bool, bool]:
+    return await asyncio.get_running_loop().run_in_executor(password_executor, verify_password, password, password_hash)
@@ -0,0 +1,210 @@
+"""asset_balances, asset_monthly_balances 테이블을 관리합니다.
+
+두 테이블은 asset_records에서 계산되는 값을 미리 저장해 두는 테이블로, 기록을 추가하거나 삭제하는 API는
+같은 트랜잭션 안에서 apply_record_changes를 호출해야 합니다. 값이 어긋났는지 확인하거나 다시 계산할 때는
+aco-book-server 디렉터리에서 다음 명령을 실행합니다. 이 테이블이 생기기 전부터 있던 DB는 마이그레이션(app.migrations)에서 한 번 다시 계산합니다.
+
+    python -m app.balances verify
+    python -m app.balances rebuild
+"""
+import sys
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+from sqlalchemy import String, case, cast, func, insert, update
+from sqlalchemy.orm import Session
+
+from app.database import Asset, AssetBalance, AssetMonthlyBalance, AssetRecord
+from app.utils import month_of
+
+
+def _currency_name(value: Any) -> str:
+    if value is None:
+        return ""
+    return getattr(value, "name", value)
+
+
+def apply_record_changes(db: Session, records: Iterable[Mapping[str, Any]], sign: int = 1) -> None:
+    """추가(sign=1)되거나 삭제(sign=-1)된 기록만큼 잔액 테이블을 갱신합니다. 커밋은 호출한 쪽에서 수행합니다.
+
+    Args:
+        db (Session): 기록을 변경하는 것과 같은 세션
+        records (Iterable[Mapping[str, Any]]): asset_id, date, payment_amount, currency를 가진 기록
+        sign (int, optional): 추가는 1, 삭제는 -1. Defaults to 1.
+    """
+    balances: Dict[int, List[float]] = defaultdict(lambda: [0.0, 0])
+    monthly: Dict[Tuple[int, str, str], List[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+    for record in records:
+        amount = record["payment_amount"] * sign
+        balance = balances[record["asset_id"]]
+        balance[0] += amount
+        balance[1] += sign
+
+        month = monthly[(record["asset_id"], record["date"].strftime("%Y-%m"), _currency_name(record["currency"]))]
+        if record["payment_amount"] > 0:
+            month[0] += amount
+        elif record["payment_amount"] < 0:
+            month[1] += amount
+        month[2] += sign
+
+    if balances:
+        upsert_increments(
+            db,
+            AssetBalance,
+            ["asset_id"],
+            [{"asset_id": asset_id, "balance": value[0], "record_count": value[1]} for asset_id, value in balances.items()],
+        )
+    if monthly:
+        upsert_increments(
+            db,
+            AssetMonthlyBalance,
+            ["asset_id", "month", "currency"],
+            [
+                {
+                    "asset_id": asset_id,
+                    "month": month,
+                    "currency": currency,
+                    "income": value[0],
+                    "expense": value[1],
+                    "net": value[0] + value[1],
+                    "record_count": value[2],
+                }
+                for (asset_id, month, currency), value in monthly.items()
+            ],
+        )
+
+
+def upsert_increments(db: Session, model, keys: List[str], rows: List[Dict[str, Any]]) -> None:
+    """키가 이미 있으면 키가 아닌 값을 더하고, 없으면 새로 추가합니다."""
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        statement = dialect_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=keys,
+            set_={name: table.c[name] + statement.excluded[name] for name in rows[0] if name not in keys},
+        )
+        db.execute(statement, rows)
+        return
+
+    for row in rows:
+        condition = [table.c[key] == row[key] for key in keys]
+        values = {name: table.c[name] + row[name] for name in row if name not in keys}
+        if db.execute(update(table).where(*condition).values(values)).rowcount == 0:
+            db.execute(insert(table).values(row))
+
+
+def remove_assets(db: Session, asset_ids: Iterable[int]) -> None:
+    """삭제된 자산의 잔액 행을 제거합니다."""
+    asset_ids = list(asset_ids)
+    db.query(AssetBalance).filter(AssetBalance.asset_id.in_(asset_ids)).delete(synchronize_session=False)
+    db.query(AssetMonthlyBalance).filter(AssetMonthlyBalance.asset_id.in_(asset_ids)).delete(synchronize_session=False)
+
+
+def _expected_balances(db: Session):
+    return (
+        db.query(
+            AssetRecord.asset_id,
+            func.sum(AssetRecord.payment_amount).label("balance"),
+            func.count(AssetRecord.id).label("record_count"),
+        )
+        .join(Asset, AssetRecord.asset_id == Asset.id)
+        .group_by(AssetRecord.asset_id)
+    )
+
+
+def _expected_monthly_balances(db: Session):
+    amount = AssetRecord.payment_amount
+    month = month_of(db, AssetRecord.date)
+    currency = func.coalesce(cast(AssetRecord.currency, String), "")
+    return (
+        db.query(
+            AssetRecord.asset_id,
+            month.label("month"),
+            currency.label("currency"),
+            func.sum(case((amount > 0, amount), else_=0)).label("income"),
+            func.sum(case((amount < 0, amount), else_=0)).label("expense"),
+            func.sum(amount).label("net"),
+            func.count(AssetRecord.id).label("record_count"),
+        )
+        .join(Asset, AssetRecord.asset_id == Asset.id)
+        .group_by(AssetRecord.asset_id, month, currency)
+    )
+
+
+def rebuild(db: Session) -> None:
+    """asset_records 전체에서 잔액 테이블을 다시 계산합니다."""
+    db.query(AssetBalance).delete(synchronize_session=False)
+    db.query(AssetMonthlyBalance).delete(synchronize_session=False)
+    db.execute(
+        insert(AssetBalance).from_select(["asset_id", "balance", "record_count"], _expected_balances(db).statement)
+    )
+    db.execute(
+        insert(AssetMonthlyBalance).from_select(
+            ["asset_id", "month", "currency", "income", "expense", "net", "record_count"],
+            _expected_monthly_balances(db).statement,
+        )
+    )
+    db.commit()
+
+
+def verify(db: Session, tolerance: float = 1e-6) -> List[str]:
+    """저장된 잔액과 asset_records에서 계산한 값을 비교해 어긋난 항목을 반환합니다."""
+    problems = []
+
+    expected = {row.asset_id: (row.balance, row.record_count) for row in _expected_balances(db)}
+    stored = {row.asset_id: (row.balance, row.record_count) for row in db.query(AssetBalance).filter(AssetBalance.record_count != 0)}
+    for asset_id in expected.keys() | stored.keys():
+        exp, got = expected.get(asset_id, (0, 0)), stored.get(asset_id, (0, 0))
+        if abs(exp[0] - got[0]) > tolerance or exp[1] != got[1]:
+            problems.append(f"asset {asset_id}: expected balance={exp[0]} count={exp[1]}, stored balance={got[0]} count={got[1]}")
+
+    columns = ("income", "expense", "net", "record_count")
+    expected = {
+        (row.asset_id, row.month, _currency_name(row.currency)): tuple(getattr(row, col) for col in columns)
+        for row in _expected_monthly_balances(db)
+    }
+    stored = {
+        (row.asset_id, row.month, row.currency): tuple(getattr(row, col) for col in columns)
+        for row in db.query(AssetMonthlyBalance).filter(AssetMonthlyBalance.record_count != 0)
+    }
+    for key in expected.keys() | stored.keys():
+        exp, got = expected.get(key, (0, 0, 0, 0)), stored.get(key, (0, 0, 0, 0))
+        if any(abs(a - b) > tolerance for a, b in zip(exp, got)):
+            problems.append(f"asset {key[0]} {key[1]} {key[2] or '-'}: expected {exp}, stored {got}")
+
+    return problems
+
+
+def main(argv: List[str]) -> int:
+    from app.database import db as database
+
+    command = argv[0] if argv else ""
+    if command not in ("rebuild", "verify"):
+        print("usage: python -m app.balances {rebuild|verify}")
+        return 2
+
+    database.create_tables()
+    session = database.SessionLocal()
+    try:
+        if command == "rebuild":
+            rebuild(session)
+            print("Rebuilt asset_balances and asset_monthly_balances")
+            return 0
+
+        problems = verify(session)
+        for problem in problems:
+            print(problem)
+        print(f"{len(problems)} mismatches")
+        return 1 if problems else 0
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,103 @@
+import os
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class Settings:
+    """서버 설정입니다. 각 항목은 ACO_ 접두어를 붙인 대문자 환경 변수로 바꿀 수 있습니다.
+
+    예) ACO_DATABASE_URL=postgresql+psycopg2://user:pw@localhost/aco, ACO_SQLITE_PATH=./data/core.db
+    """
+
+    # database_url이 없으면 sqlite_path의 SQLite 파일을 사용
+    database_url: Optional[str] = None
+    sqlite_path: str = "./core.db"
+
+    # PostgreSQL 등 서버 DB의 커넥션 풀 설정
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_echo: bool = False
+
+    # SQLite 연결마다 적용하는 PRAGMA
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout: int = 5000
+    sqlite_cache_size: int = -64000
+    sqlite_mmap_size: int = 268435456
+
+    # exchange_rates 테이블의 환율이 기준으로 삼는 통화
+    rate_base_currency: str = "KRW"
+
+    # 토큰 서명 키. 키를 교체할 때는 기존 키를 jwt_previous_secrets(쉼표로 구분)에 남겨 두면 만료 전 토큰도 검증됨
+    jwt_secret: str = "ms_key"
+    jwt_previous_secrets: str = ""
+    jwt_algorithm: str = "HS256"
+    jwt_expire_minutes: int = 60
+    jwt_cache_size: int = 10000
+
+    # 응답 압축. 이보다 작은 응답은 압축하지 않음
+    compression_minimum_size: int = 1024
+    gzip_level: int = 6
+    brotli_quality: int = 4
+
+    # /sync 삭제 기록 보관 기간(일)과, 커밋이 늦게 끝난 변경을 놓치지 않도록 next_since를 앞당기는 시간(초)
+    sync_tombstone_days: int = 90
+    sync_overlap_seconds: float = 5.0
+
+    # 요청별 지연 시간과 SQL 사용량 집계(/metrics). server_timing을 켜면 응답에 Server-Timing 헤더를 추가
+    metrics_enabled: bool = True
+    server_timing: bool = False
+    # /metrics를 조회할 때 Authorization: Bearer 헤더로 보낼 토큰. 비어 있으면 /metrics는 404
+    metrics_token: str = ""
+
+    # 요청당 SQL 개수 한도 확인. "off", "warn"(로그), "raise"(테스트용 예외). 한도를 선언하지 않은 라우트에는 query_budget_default 적용(0이면 제한 없음)
+    query_budget_mode: str = "warn"
+    query_budget_default: int = 30
+
+    # 서버 시작 시 적용하지 않은 스키마 마이그레이션이 있으면 적용. 여러 워커로 실행할 때는 끄고 python -m app.migrations upgrade로 미리 적용
+    migrate_on_startup: bool = True
+
+    # 비밀번호 해시 방식("scrypt" 또는 "pbkdf2_sha256")과 비용. 바꾸면 기존 해시는 다음 로그인 때 새 설정으로 다시 저장됨
+    password_scheme: str = "scrypt"
+    scrypt_n: int = 16384
+    scrypt_r: int = 8
+    scrypt_p: int = 1
+    pbkdf2_iterations: int = 600000
+    # 해시 계산에 사용하는 스레드 수. 0이면 CPU 수
+    password_hash_workers: int = 0
+
+    @property
+    def resolved_database_url(self) -> str:
+        return self.database_url or f"sqlite:///{self.sqlite_path}"
+
+    @property
+    def jwt_verification_secrets(self) -> List[str]:
+        previous = [secret.strip() for secret in self.jwt_previous_secrets.split(",") if secret.strip()]
+        return [self.jwt_secret] + previous
+
+    @classmethod
+    def from_env(cls, environ: Optional[Dict[str, str]] = None) -> "Settings":
+        environ = os.environ if environ is None else environ
+        values: Dict[str, Any] = {}
+        for field in fields(cls):
+            raw = environ.get(f"ACO_{field.name.upper()}")
+            if raw is None:
+                continue
+            values[field.name] = _parse_value(raw, field.default)
+        return cls(**values)
+
+
+def _parse_value(raw: str, default: Any) -> Any:
+    if isinstance(default, bool):
+        return raw.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(raw)
+    if isinstance(default, float):
+        return float(raw)
+    return raw
+
+
+settings = Settings.from_env()
@@ -0,0 +1,177 @@
+"""exchange_rates 테이블을 이용한 통화 변환입니다.
+
+환율은 날짜별로 통화 1단위가 기준 통화(settings.rate_base_currency)로 얼마인지를 저장하며,
+aco-book-server 디렉터리에서 date,currency,rate 헤더를 가진 CSV 파일로 불러옵니다.
+
+    python -m app.currency load ./rates/2024.csv ./rates/2025.csv
+
+특정 날짜의 환율이 없으면 그 이전의 가장 최근 환율을, 그것도 없으면 가장 오래된 환율을 사용합니다.
+"""
+import csv
+import sys
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.cache import TTLCache
+from app.config import settings
+from app.database import Currency, ExchangeRate
+
+
+class MissingRateError(ValueError):
+    pass
+
+
+class RateTable:
+    """통화별 환율을 날짜순 배열로 보관하고 여러 값을 한 번에 변환합니다."""
+
+    def __init__(self, base: str, series: Dict[str, Tuple[Any, Any]]) -> None:
+        self.base = base
+        self.series = series
+        self._rate_cache: Dict[Tuple[str, date], float] = {}
+
+    @classmethod
+    def load(cls, db: Session, base: str = settings.rate_base_currency) -> "RateTable":
+        import numpy as np
+
+        rows = db.query(ExchangeRate.currency, ExchangeRate.date, ExchangeRate.rate).order_by(ExchangeRate.currency, ExchangeRate.date).all()
+        grouped: Dict[str, Tuple[List[date], List[float]]] = {}
+        for row in rows:
+            dates, rates = grouped.setdefault(row.currency.name, ([], []))
+            dates.append(row.date)
+            rates.append(row.rate)
+
+        series = {
+            currency: (np.array(dates, dtype="datetime64[D]"), np.array(rates, dtype="float64"))
+            for currency, (dates, rates) in grouped.items()
+        }
+        return cls(base, series)
+
+    def has_currency(self, currency: str) -> bool:
+        """currency를 기준 통화로 변환할 환율이 있으면 참입니다."""
+        return currency == self.base or currency in self.series
+
+    def rates_for(self, currency: str, dates):
+        """currency의 기준 통화 대비 환율을 dates(datetime64[D] 배열)마다 반환합니다."""
+        import numpy as np
+
+        if currency == self.base:
+            return np.ones(len(dates))
+        if currency not in self.series:
+            raise MissingRateError(f"No exchange rate for {currency}")
+
+        series_dates, series_rates = self.series[currency]
+        index = np.searchsorted(series_dates, dates, side="right") - 1
+        return series_rates[np.clip(index, 0, None)]
+
+    def rate(self, currency: str, day: date) -> float:
+        key = (currency, day)
+        rate = self._rate_cache.get(key)
+        if rate is None:
+            import numpy as np
+
+            rate = float(self.rates_for(currency, np.array([day], dtype="datetime64[D]"))[0])
+            self._rate_cache[key] = rate
+        return rate
+
+    def conversion_factors(self, currencies: Sequence[Optional[str]], dates: Sequence[Any], target: str):
+        """각 금액에 곱하면 target 통화 금액이 되는 값을 반환합니다. 통화가 없는 값은 변환하지 않습니다(1)."""
+        import numpy as np
+
+        currencies = np.asarray(currencies, dtype=object)
+        dates = to_days(dates)
+        factors = np.ones(len(currencies))
+        if len(currencies) == 0:
+            return factors
+
+        target_rates = self.rates_for(target, dates)
+        for currency in set(currencies.tolist()):
+            if currency is None or currency == "" or currency == target:
+                continue
+            mask = currencies == currency
+            factors[mask] = self.rates_for(currency, dates[mask]) / target_rates[mask]
+        return factors
+
+
+def to_days(values: Sequence[Any]):
+    """datetime, date 또는 ISO 8601 문자열 목록을 datetime64[D] 배열로 변환합니다."""
+    import numpy as np
+
+    values = [value[:10] if isinstance(value, str) else value for value in values]
+    values = [value.date() if isinstance(value, datetime) else value for value in values]
+    return np.array(values, dtype="datetime64[D]")
+
+
+rate_table_cache = TTLCache(maxsize=1, ttl=600.0)
+
+
+def get_rate_table(db: Session) -> RateTable:
+    table = rate_table_cache.get("rates")
+    if table is None:
+        table = RateTable.load(db)
+        rate_table_cache.set("rates", table)
+    return table
+
+
+def validate_currency(currency: str) -> str:
+    """Currency에 없는 통화 코드이면 ValueError를 발생시킵니다. 환율이 있는지는 RateTable.has_currency로 확인합니다."""
+    if currency not in Currency.__members__:
+        raise ValueError(f"Unknown currency {currency}")
+    return currency
+
+
+def convert_record_batches(
+    batches: Iterator[List[Dict[str, Any]]], table: RateTable, target: str
+) -> Iterator[List[Dict[str, Any]]]:
+    """iter_serialized_batches로 읽은 기록의 금액을 배치 단위로 target 통화로 바꿉니다."""
+    for rows in batches:
+        if rows:
+            factors = table.conversion_factors([row["currency"] for row in rows], [row["date"] for row in rows], target)
+            for row, factor in zip(rows, factors.tolist()):
+                row["payment_amount"] = row["payment_amount"] * factor
+                if row["approved_amount"] is not None:
+                    row["approved_amount"] = row["approved_amount"] * factor
+                if row["currency"] is not None:
+                    row["currency"] = target
+        yield rows
+
+
+def load_rate_file(db: Session, path: str) -> int:
+    """date,currency,rate 헤더를 가진 CSV 파일의 환율을 저장합니다. 같은 통화, 날짜의 환율은 덮어씁니다."""
+    count = 0
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        for row in csv.DictReader(file):
+            currency = validate_currency(row["currency"].strip().upper())
+            db.merge(
+                ExchangeRate(
+                    currency=Currency[currency],
+                    date=date.fromisoformat(row["date"].strip()[:10]),
+                    rate=float(row["rate"]),
+                )
+            )
+            count += 1
+    db.commit()
+    rate_table_cache.clear()
+    return count
+
+
+def main(argv: List[str]) -> int:
+    from app.database import db as database
+
+    if len(argv) < 2 or argv[0] != "load":
+        print("usage: python -m app.currency load <file.csv> [<file.csv> ...]")
+        return 2
+
+    database.create_tables()
+    session = database.SessionLocal()
+    try:
+        for path in argv[1:]:
+            print(f"{path}: {load_rate_file(session, path)} rates")
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
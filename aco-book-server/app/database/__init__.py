@@ -1,4 +1,4 @@
-from app.database.database import db, User, Currency, FinancialRecord, UserGroup, UserGroupRelation, Asset, AssetRecord
+from app.database.database import db, User, Currency, FinancialRecord, UserGroup, UserGroupRelation, Asset, AssetRecord, AssetBalance, AssetMonthlyBalance, ExchangeRate, DeletedRow, GroupVersion
 
 db
 User
@@ -8,3 +8,8 @@ UserGroup
 UserGroupRelation
 Asset
 AssetRecord
+AssetBalance
+AssetMonthlyBalance
+ExchangeRate
+DeletedRow
+GroupVersion
@@ -1,18 +1,27 @@
 import enum
+from datetime import datetime, timezone
+from typing import Any, Dict
 
 from sqlalchemy import (
     Column,
+    Date,
     DateTime,
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Boolean,
     create_engine,
+    event,
+    text,
 )
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import DeclarativeMeta, relationship, sessionmaker
+from sqlalchemy.orm import DeclarativeMeta, close_all_sessions, relationship, sessionmaker
+
+from app.config import Settings, settings
 
 
 Base: DeclarativeMeta = declarative_base()
@@ -36,23 +45,89 @@ class AssetType(enum.Enum):
     OTHER_ASSETS = "Other Assets"
 
 
+SQLITE_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SQLITE_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
 class Database:
-    def __init__(self) -> None:
-        self.engine = create_engine(
-            "sqlite:///./core.db", connect_args={"check_same_thread": False}
-        )
+    def __init__(self, settings: Settings = settings) -> None:
+        self.settings = settings
+        url = make_url(settings.resolved_database_url)
+
+        if url.get_backend_name() == "sqlite":
+            self.engine = create_engine(
+                url,
+                echo=settings.db_echo,
+                connect_args={"check_same_thread": False, "timeout": settings.sqlite_busy_timeout / 1000},
+            )
+            event.listen(self.engine, "connect", self._apply_sqlite_pragmas)
+        else:
+            self.engine = create_engine(
+                url,
+                echo=settings.db_echo,
+                pool_size=settings.db_pool_size,
+                max_overflow=settings.db_max_overflow,
+                pool_timeout=settings.db_pool_timeout,
+                pool_recycle=settings.db_pool_recycle,
+                pool_pre_ping=True,
+            )
+
         self.SessionLocal = sessionmaker(
             autocommit=False, autoflush=False, bind=self.engine
         )
 
+    def _apply_sqlite_pragmas(self, dbapi_connection, _) -> None:
+        journal_mode = self.settings.sqlite_journal_mode.upper()
+        synchronous = self.settings.sqlite_synchronous.upper()
+        if journal_mode not in SQLITE_JOURNAL_MODES:
+            raise ValueError(f"Unknown SQLite journal mode '{journal_mode}'")
+        if synchronous not in SQLITE_SYNCHRONOUS:
+            raise ValueError(f"Unknown SQLite synchronous setting '{synchronous}'")
+
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(self.settings.sqlite_busy_timeout)}")
+        cursor.execute(f"PRAGMA cache_size={int(self.settings.sqlite_cache_size)}")
+        cursor.execute(f"PRAGMA mmap_size={int(self.settings.sqlite_mmap_size)}")
+        cursor.close()
+
+    def ping(self) -> None:
+        """DB에 간단한 쿼리를 실행합니다. 연결할 수 없으면 SQLAlchemyError를 발생시킵니다."""
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    def pool_status(self) -> Dict[str, Any]:
+        """커넥션 풀 사용 현황을 반환합니다. 풀 종류에 따라 제공되지 않는 항목은 생략됩니다."""
+        pool = self.engine.pool
+        status: Dict[str, Any] = {"pool": type(pool).__name__}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, name, None)
+            if callable(method):
+                status[name] = method()
+        if status.get("size"):
+            # 1보다 크면 overflow 연결까지 사용 중
+            status["utilization"] = status.get("checkedout", 0) / status["size"]
+        return status
+
     def create_tables(self):
-        Base.metadata.create_all(bind=self.engine)
+        """적용하지 않은 스키마 마이그레이션을 모두 적용합니다. 새 DB를 만드는 CLI와 벤치마크에서 사용합니다."""
+        from app.migrations import upgrade
+
+        upgrade(self.engine)
+
+    def check_schema(self, apply_pending: bool = True) -> None:
+        """서버 시작 시 스키마 버전만 확인합니다. 자세한 동작은 app.migrations.check를 참고합니다."""
+        from app.migrations import check
+
+        check(self.engine, apply_pending)
 
     def dispose(self):
-        self.SessionLocal.close_all()
+        close_all_sessions()
         self.engine.dispose()
 
     def get_db(self):
+        # 동기 세션이므로 이 의존성을 사용하는 API는 async def가 아닌 def로 선언해 스레드 풀에서 실행되도록 함
         db = self.SessionLocal()
         try:
             yield db
@@ -60,6 +135,11 @@ class Database:
             db.close()
 
 
+def utc_now() -> datetime:
+    # DateTime 컬럼에는 시간대 없이 UTC 시각을 저장
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -77,6 +157,8 @@ class UserGroup(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, unique=True)
     admin = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # 동기화(/sync)용 변경 시각. 이 컬럼이 추가되기 전의 행은 5번 마이그레이션에서 채움
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now, index=True)
 
     user = relationship("User")
 
@@ -97,10 +179,11 @@ class Asset(Base):
     __tablename__ = "assets"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    owner_group_id = Column(Integer, ForeignKey("user_groups.id"), nullable=False)
+    owner_group_id = Column(Integer, ForeignKey("user_groups.id"), nullable=False, index=True)
     name = Column(String)
     asset_type = Column(Enum(AssetType))
     currency = Column(Enum(Currency))
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now, index=True)
 
     group = relationship("UserGroup")
 
@@ -115,9 +198,69 @@ class AssetRecord(Base):
     payment_amount = Column(Float, nullable=False)
     currency = Column(Enum(Currency))
     approved_amount = Column(Float)
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now, index=True)
 
     asset = relationship("Asset")
 
+    # 자산별 기간 조회와 (date, id) 키셋 페이지네이션용 복합 인덱스. 여러 자산의 기록을 최신순으로 읽을 때는
+    # (date, id) 인덱스를 순서대로 훑으며 자산을 확인해 limit개에서 멈춤(app.routers.records.filter_records 참고)
+    __table_args__ = (
+        Index("ix_asset_records_asset_id_date_id", "asset_id", "date", "id"),
+        Index("ix_asset_records_date_id", "date", "id"),
+    )
+
+
+class DeletedRow(Base):
+    __tablename__ = "deleted_rows"
+
+    # 동기화(/sync)용 삭제 기록. 자산, 기록은 소유 그룹(group_id)으로, 그룹은 삭제 당시의 구성원(user_id)마다 저장
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    table_name = Column(String, nullable=False)
+    row_id = Column(Integer, nullable=False)
+    group_id = Column(Integer, index=True)
+    user_id = Column(Integer, index=True)
+    deleted_at = Column(DateTime, nullable=False, default=utc_now, index=True)
+
+
+class GroupVersion(Base):
+    __tablename__ = "group_versions"
+
+    # 목록 API의 ETag(app.versions)에 사용하는 그룹별 자원 변경 횟수. 변경 API가 같은 트랜잭션에서 증가시킴
+    group_id = Column(Integer, primary_key=True)
+    resource = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class AssetBalance(Base):
+    __tablename__ = "asset_balances"
+
+    # asset_records에서 계산되는 값으로, app.balances에서 기록 추가/삭제와 같은 트랜잭션으로 갱신
+    asset_id = Column(Integer, ForeignKey("assets.id"), primary_key=True)
+    balance = Column(Float, nullable=False, default=0)
+    record_count = Column(Integer, nullable=False, default=0)
+
+
+class AssetMonthlyBalance(Base):
+    __tablename__ = "asset_monthly_balances"
+
+    asset_id = Column(Integer, ForeignKey("assets.id"), primary_key=True)
+    month = Column(String(7), primary_key=True)
+    # 기본키에는 NULL을 넣을 수 없으므로 통화가 없는 기록은 빈 문자열로 저장
+    currency = Column(String(3), primary_key=True, default="")
+    income = Column(Float, nullable=False, default=0)
+    expense = Column(Float, nullable=False, default=0)
+    net = Column(Float, nullable=False, default=0)
+    record_count = Column(Integer, nullable=False, default=0)
+
+
+class ExchangeRate(Base):
+    __tablename__ = "exchange_rates"
+
+    # 해당 날짜에 통화 1단위가 기준 통화(settings.rate_base_currency)로 얼마인지
+    currency = Column(Enum(Currency), primary_key=True)
+    date = Column(Date, primary_key=True)
+    rate = Column(Float, nullable=False)
+
 
 class FinancialRecord(Base):
     __tablename__ = "financial_records"
@@ -0,0 +1,143 @@
+import csv
+import importlib.util
+import io
+import json
+from functools import lru_cache
+from tempfile import SpooledTemporaryFile
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy.orm import DeclarativeMeta
+from sqlalchemy.sql.sqltypes import Boolean, Float, Integer
+
+from app.serializers import get_serializer
+
+# 이 크기를 넘는 XLSX, Parquet, Arrow 결과만 임시 파일로 옮겨지며, 닫을 때 자동으로 삭제됨
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+
+Batches = Iterator[List[Dict[str, Any]]]
+
+
+class ExportFormat(NamedTuple):
+    extension: str
+    media_type: str
+    write: Callable[[Batches, DeclarativeMeta], Iterator[bytes]]
+    requires: Optional[str] = None
+
+
+def write_csv(batches: Batches, db_type: DeclarativeMeta) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(get_serializer(db_type).columns)
+    # 엑셀에서 한글이 깨지지 않도록 BOM을 붙임
+    yield ("\ufeff" + buffer.getvalue()).encode()
+
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(row.values() for row in rows)
+        yield buffer.getvalue().encode()
+
+
+def write_ndjson(batches: Batches, db_type: DeclarativeMeta) -> Iterator[bytes]:
+    for rows in batches:
+        yield "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+
+def write_xlsx(batches: Batches, db_type: DeclarativeMeta) -> Iterator[bytes]:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(get_serializer(db_type).columns)
+    for rows in batches:
+        for row in rows:
+            sheet.append(list(row.values()))
+
+    buffer = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    workbook.save(buffer)
+    yield from iter_file(buffer)
+
+
+def _arrow_schema(db_type: DeclarativeMeta):
+    import pyarrow as pa
+
+    fields = []
+    for col in get_serializer(db_type).select_columns:
+        if isinstance(col.type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(col.type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(col.type, Float):
+            arrow_type = pa.float64()
+        else:
+            # Enum은 이름, DateTime은 ISO 8601 문자열로 직렬화됨
+            arrow_type = pa.string()
+        fields.append(pa.field(col.name, arrow_type, nullable=col.nullable))
+    return pa.schema(fields)
+
+
+def write_parquet(batches: Batches, db_type: DeclarativeMeta) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(db_type)
+    buffer = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    with pq.ParquetWriter(buffer, schema) as writer:
+        for rows in batches:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+    yield from iter_file(buffer)
+
+
+def write_arrow(batches: Batches, db_type: DeclarativeMeta) -> Iterator[bytes]:
+    import pyarrow as pa
+
+    schema = _arrow_schema(db_type)
+    buffer = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    with pa.ipc.new_stream(buffer, schema) as writer:
+        for rows in batches:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+    yield from iter_file(buffer)
+
+
+def rows_to_arrow_ipc(rows: Iterable[Sequence[Any]], db_type: DeclarativeMeta) -> bytes:
+    """get_serializer(db_type).select_columns로 조회한 컬럼 튜플을 Arrow IPC 스트림으로 변환합니다."""
+    import pyarrow as pa
+
+    schema = _arrow_schema(db_type)
+    table = pa.Table.from_pydict(get_serializer(db_type).rows_to_columns(rows), schema=schema)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def iter_file(file: IO[bytes]) -> Iterator[bytes]:
+    """파일을 처음부터 READ_CHUNK_SIZE씩 읽어 전달하고 닫습니다."""
+    try:
+        file.seek(0)
+        while chunk := file.read(READ_CHUNK_SIZE):
+            yield chunk
+    finally:
+        file.close()
+
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {
+    "csv": ExportFormat("csv", "text/csv; charset=utf-8", write_csv),
+    "ndjson": ExportFormat("ndjson", "application/x-ndjson", write_ndjson),
+    "xlsx": ExportFormat("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", write_xlsx, "openpyxl"),
+    "parquet": ExportFormat("parquet", "application/vnd.apache.parquet", write_parquet, "pyarrow"),
+    "arrow": ExportFormat("arrow", "application/vnd.apache.arrow.stream", write_arrow, "pyarrow"),
+}
+
+
+def is_format_available(export_format: ExportFormat) -> bool:
+    if export_format.requires is None:
+        return True
+    return _is_installed(export_format.requires)
+
+
+@lru_cache(maxsize=None)
+def _is_installed(module: str) -> bool:
+    # 모듈을 불러오지 않고 설치 여부만 확인. 실제 import는 write_* 함수가 처음 실행될 때 함
+    return importlib.util.find_spec(module) is not None
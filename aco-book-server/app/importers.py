@@ -0,0 +1,71 @@
+import codecs
+import csv
+from datetime import datetime
+from itertools import islice
+from typing import IO, Any, Collection, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+def iter_csv_rows(file: IO[bytes], encoding: str = "utf-8-sig") -> Iterator[Sequence[Any]]:
+    """업로드된 CSV 파일을 한 줄씩 읽습니다. 파일 전체를 메모리에 올리지 않습니다."""
+    reader = codecs.getreader(encoding)(file)
+    yield from csv.reader(reader)
+
+
+def iter_xlsx_rows(file: IO[bytes]) -> Iterator[Sequence[Any]]:
+    """업로드된 XLSX 파일의 첫 번째 시트를 openpyxl 읽기 전용 모드로 한 행씩 읽습니다."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_record_items(
+    rows: Iterator[Sequence[Any]], fields: Collection[str], defaults: Optional[Dict[str, Any]] = None
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """첫 행을 헤더로 사용해 각 행을 {필드 이름: 값}으로 변환합니다.
+
+    Args:
+        rows (Iterator[Sequence[Any]]): iter_csv_rows 또는 iter_xlsx_rows의 결과
+        fields (Collection[str]): 사용할 필드 이름. 헤더 중 여기에 없는 열은 무시합니다.
+        defaults (Optional[Dict[str, Any]], optional): 파일에 없거나 비어 있는 필드의 기본값. Defaults to None.
+
+    Yields:
+        Tuple[int, Dict[str, Any]]: (파일에서의 행 번호, 행 데이터). 행 번호는 헤더를 1로 하여 셉니다.
+    """
+    header = next(rows, None)
+    if header is None:
+        return
+
+    columns = []
+    for index, name in enumerate(header):
+        name = str(name).strip().lower() if name is not None else ""
+        if name in fields:
+            columns.append((index, name))
+
+    defaults = defaults or {}
+    for row_number, row in enumerate(rows, start=2):
+        if not any(value not in (None, "") for value in row):
+            continue
+
+        item = dict(defaults)
+        for index, name in columns:
+            value = row[index] if index < len(row) else None
+            if isinstance(value, str):
+                value = value.strip()
+            if value in (None, ""):
+                continue
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            item[name] = value
+        yield row_number, item
+
+
+def chunked(items: Iterator[Any], size: int) -> Iterator[List[Any]]:
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
@@ -1,38 +1,57 @@
+import hmac
 import logging
+import time
 from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Optional
 
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import SQLAlchemyError
 
+from . import metrics, query_budget
+from .compression import CompressionMiddleware
+from .config import settings
 from .database import db
-from .routers import users, token, assets, groups, records
+from .responses import FastJSONResponse
+from .routers import users, token, assets, groups, records, summaries, sync
 
 logger = logging.getLogger("uvicorn.error")
 logger.setLevel(logging.DEBUG)
 
 
-templates = Jinja2Templates(directory="templates")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-    db.create_tables()
+    # 스키마는 버전만 확인하고, 적용하지 않은 마이그레이션이 있을 때만 실행
+    began = time.perf_counter()
+    db.check_schema(apply_pending=settings.migrate_on_startup)
+    logger.info(f"Schema check finished in {(time.perf_counter() - began) * 1000:.1f} ms")
     yield
     db.dispose()
 
 
-app = FastAPI(lifespan=lifespan, logger=logger, debug=True)
+app = FastAPI(lifespan=lifespan, logger=logger, debug=True, default_response_class=FastJSONResponse)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 app.include_router(users.router)
 app.include_router(token.router)
 app.include_router(groups.router)
 app.include_router(assets.router)
 app.include_router(records.router)
+app.include_router(summaries.router)
+app.include_router(sync.router)
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.gzip_level,
+    brotli_quality=settings.brotli_quality,
+)
 
 # 모든 출처 허용
 # Todo: 추후 외부 서버 개발 시, CORS 설정 삭제 또는 수정 필요
@@ -40,6 +59,7 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],  # 특정 도메인으로 제한 가능
     allow_credentials=True,
+    expose_headers=["X-Next-Cursor"],
     allow_methods=["GET", "POST", "UPDATE", "DELETE", "HEAD", "OPTIONS"],
     allow_headers=[
         "Access-Control-Allow-Headers",
@@ -56,7 +76,55 @@ app.add_middleware(
     ],
 )
 
+# 요청별 SQL 집계와 쿼리 한도 확인이 같은 엔진 이벤트를 사용
+if settings.metrics_enabled or settings.query_budget_mode != "off":
+    metrics.instrument_engine(db.engine)
+
+if settings.query_budget_mode != "off":
+    app.add_middleware(
+        query_budget.QueryBudgetMiddleware,
+        mode=settings.query_budget_mode,
+        default_budget=settings.query_budget_default,
+    )
+
+# 압축 후 응답 크기와 CORS 처리까지 포함해 측정하도록 가장 바깥에 추가
+if settings.metrics_enabled:
+    app.add_middleware(metrics.MetricsMiddleware, server_timing=settings.server_timing)
+
+
+@app.get("/status/database", tags=["status"])
+def get_database_status():
+    # 인증 없이 호출하는 상태 확인이므로 DB 응답 여부만 알림. 커넥션 풀 현황은 /metrics에서 제공
+    try:
+        db.ping()
+    except SQLAlchemyError:
+        logger.exception("Database health check failed")
+        return FastJSONResponse({"status": "unavailable"}, status_code=503)
+    return {"status": "ok"}
+
+
+def check_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    # 경로, 요청 수 등 내부 정보이므로 토큰을 설정한 경우에만 노출
+    if not settings.metrics_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.metrics_token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+
+
+@app.get("/metrics", tags=["status"], response_class=PlainTextResponse, dependencies=[Depends(check_metrics_token)])
+def get_metrics():
+    return PlainTextResponse(metrics.render() + metrics.render_pool(db.pool_status()), media_type=metrics.CONTENT_TYPE)
+
 
 @app.get("/", response_class=HTMLResponse)
 def get_prototype_page(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return _templates().TemplateResponse("index.html", {"request": request})
+
+
+@lru_cache(maxsize=None)
+def _templates():
+    # jinja2는 이 페이지에서만 사용하므로 처음 요청할 때 불러옴
+    from fastapi.templating import Jinja2Templates
+
+    return Jinja2Templates(directory="templates")
@@ -0,0 +1,309 @@
+"""요청별 지연 시간과 SQL 사용량을 모아 /metrics에서 Prometheus 텍스트 형식으로 제공합니다.
+
+MetricsMiddleware가 요청마다 RequestMetrics를 만들어 컨텍스트 변수에 두면, 엔진의 SQLAlchemy 이벤트와
+직렬화(app.utils), JSON 인코딩(app.responses) 코드가 같은 요청의 값에 더합니다. 요청이 끝나면 경로 템플릿
+(/records/{record_id} 등) 단위로 집계합니다. 스레드 풀에서 실행되는 동기 API도 요청의 컨텍스트를 복사해 실행되므로 함께 집계됩니다.
+
+엔진의 SQL 이벤트는 이 모듈만 등록합니다. app.query_budget처럼 요청에서 실행한 SQL 문장이 필요한 코드는
+capture_statements로 같은 이벤트에서 받습니다.
+
+/metrics에는 DB 커넥션 풀 사용 현황(aco_db_pool_*)도 함께 들어갑니다.
+/metrics는 settings.metrics_token을 설정한 경우에만 Authorization: Bearer 헤더로 조회할 수 있습니다.
+집계는 프로세스마다 따로 하므로 여러 워커로 실행할 때는 Prometheus가 워커별 값을 합산해야 합니다.
+server_timing 설정을 켜면 응답 헤더 Server-Timing으로 db, serialize, encode, app 시간을 함께 보냅니다.
+스트리밍 응답은 헤더를 보낸 뒤에 조회와 직렬화를 하므로 Server-Timing에는 그 이전까지의 시간만 들어갑니다.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+_QUERY_STARTS_KEY = "metrics_query_starts"
+
+# 임의의 메서드로 요청할 때마다 시계열이 늘어나지 않도록 이 밖의 메서드는 "OTHER"로 집계
+KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
+class RequestMetrics:
+    """요청 하나에서 측정한 값입니다."""
+
+    __slots__ = ("sql_queries", "sql_seconds", "serialize_seconds", "encode_seconds", "rows")
+
+    def __init__(self) -> None:
+        self.sql_queries = 0
+        self.sql_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.encode_seconds = 0.0
+        self.rows = 0
+
+    def server_timing(self, total_seconds: float) -> str:
+        return (
+            f'db;dur={self.sql_seconds * 1000:.1f};desc="{self.sql_queries} queries", '
+            f"serialize;dur={self.serialize_seconds * 1000:.1f}, "
+            f"encode;dur={self.encode_seconds * 1000:.1f}, "
+            f"app;dur={total_seconds * 1000:.1f}"
+        )
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+# 진행 중인 capture_statements 블록들의 SQL 목록. 중첩된 블록은 바깥 블록에도 함께 기록됨
+_statement_logs: ContextVar[Tuple[List[str], ...]] = ContextVar("statement_logs", default=())
+
+
+def current() -> Optional[RequestMetrics]:
+    """진행 중인 요청의 RequestMetrics입니다. 요청 밖이거나 미들웨어가 꺼져 있으면 None입니다."""
+    return _current.get()
+
+
+@contextmanager
+def measure(stage: str) -> Iterator[None]:
+    """블록의 실행 시간을 현재 요청의 {stage}_seconds에 더합니다. stage는 "serialize" 또는 "encode"입니다."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        name = f"{stage}_seconds"
+        setattr(metrics, name, getattr(metrics, name) + time.perf_counter() - began)
+
+
+@contextmanager
+def capture_statements(statements: List[str]) -> Iterator[None]:
+    """블록 안에서 instrument_engine으로 등록한 엔진이 실행한 SQL 문장을 statements에 추가합니다."""
+    token = _statement_logs.set(_statement_logs.get() + (statements,))
+    try:
+        yield
+    finally:
+        _statement_logs.reset(token)
+
+
+def add_rows(count: int) -> None:
+    """현재 요청이 응답에 담은 행 수를 더합니다."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.rows += count
+
+
+class _Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str], buckets: Sequence[float]) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # 레이블 값 -> (구간별 개수, 합계, 개수)
+        self.series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in self.series.items():
+            label_text = _format_labels(self.labels, labels)
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound:g}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return lines
+
+
+class _Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str]) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.series: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...], value: float) -> None:
+        self.series[labels] = self.series.get(labels, 0) + value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in self.series.items():
+            lines.append(f"{self.name}{{{_format_labels(self.labels, labels)}}} {value:g}")
+        return lines
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in values)
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+
+_lock = threading.Lock()
+
+request_duration = _Histogram(
+    "aco_http_request_duration_seconds", "Request latency in seconds", ("method", "route", "status"), DURATION_BUCKETS
+)
+request_sql_queries = _Histogram(
+    "aco_http_request_sql_queries", "SQL statements executed per request", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+request_sql_duration = _Histogram(
+    "aco_http_request_sql_duration_seconds", "SQL execution time per request in seconds", ("method", "route"), DURATION_BUCKETS
+)
+serialize_seconds = _Counter(
+    "aco_http_response_serialize_seconds_total", "Time spent converting query results for responses", ("method", "route")
+)
+encode_seconds = _Counter("aco_http_response_encode_seconds_total", "Time spent encoding JSON responses", ("method", "route"))
+response_rows = _Counter("aco_http_response_rows_total", "Rows included in responses", ("method", "route"))
+response_bytes = _Counter("aco_http_response_bytes_total", "Response body bytes sent, after compression", ("method", "route"))
+
+_METRICS = (
+    request_duration,
+    request_sql_queries,
+    request_sql_duration,
+    serialize_seconds,
+    encode_seconds,
+    response_rows,
+    response_bytes,
+)
+
+
+def observe(method: str, route: str, status: int, seconds: float, metrics: RequestMetrics, body_bytes: int) -> None:
+    labels = (method, route)
+    with _lock:
+        request_duration.observe((method, route, str(status)), seconds)
+        request_sql_queries.observe(labels, metrics.sql_queries)
+        request_sql_duration.observe(labels, metrics.sql_seconds)
+        serialize_seconds.inc(labels, metrics.serialize_seconds)
+        encode_seconds.inc(labels, metrics.encode_seconds)
+        response_rows.inc(labels, metrics.rows)
+        response_bytes.inc(labels, body_bytes)
+
+
+def render() -> str:
+    """수집한 값을 Prometheus 텍스트 형식으로 반환합니다."""
+    with _lock:
+        lines = [line for metric in _METRICS for line in metric.render()]
+    return "\n".join(lines) + "\n"
+
+
+def render_pool(status: Dict[str, Any]) -> str:
+    """Database.pool_status()의 숫자 항목을 Prometheus gauge로 반환합니다."""
+    pool = status.get("pool", "")
+    lines = []
+    for name, value in status.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            metric = f"aco_db_pool_{name}"
+            lines += [f"# TYPE {metric} gauge", f'{metric}{{{_format_labels(("pool",), (pool,))}}} {value:g}']
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault(_QUERY_STARTS_KEY, []).append(time.perf_counter())
+    for statements in _statement_logs.get():
+        statements.append(statement)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    starts = conn.info.get(_QUERY_STARTS_KEY)
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.sql_queries += 1
+        metrics.sql_seconds += elapsed
+
+
+def _handle_error(exception_context) -> None:
+    # 실패한 쿼리는 after_cursor_execute가 호출되지 않으므로 시작 시각만 정리
+    connection = exception_context.connection
+    if connection is not None:
+        starts = connection.info.get(_QUERY_STARTS_KEY)
+        if starts:
+            starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """engine에서 실행되는 SQL의 개수와 시간을 현재 요청에, 문장을 capture_statements 블록에 기록하도록 이벤트를 등록합니다."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def method_label(method: str) -> str:
+    return method if method in KNOWN_METHODS else "OTHER"
+
+
+def route_label(scope: Scope) -> str:
+    """경로 매개변수마다 시계열이 늘어나지 않도록 실제 경로 대신 라우트의 경로 템플릿을 반환합니다."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    app = scope.get("app")
+    if app is not None:
+        for route in app.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+    return "<unmatched>"
+
+
+class MetricsMiddleware:
+    """요청별 지연 시간, SQL 개수와 시간, 직렬화와 인코딩 시간, 응답 행 수와 바이트 수를 집계하는 미들웨어입니다.
+
+    응답 바이트 수를 압축 후 크기로 세도록 CompressionMiddleware보다 바깥에 추가합니다.
+
+    Args:
+        app (ASGIApp): 감쌀 애플리케이션
+        server_timing (bool, optional): 참이면 응답에 Server-Timing 헤더를 추가. Defaults to False.
+        exclude_paths (Sequence[str], optional): 집계하지 않을 경로. Defaults to ("/metrics",).
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = False, exclude_paths: Sequence[str] = ("/metrics",)) -> None:
+        self.app = app
+        self.server_timing = server_timing
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        began = time.perf_counter()
+        status = 500
+        body_bytes = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, body_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", metrics.server_timing(time.perf_counter() - began))
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            observe(method_label(scope["method"]), route_label(scope), status, time.perf_counter() - began, metrics, body_bytes)
@@ -0,0 +1,376 @@
+"""버전별 스키마 마이그레이션입니다.
+
+적용한 버전은 schema_migrations 테이블에 기록합니다. 서버는 시작할 때 기록된 버전만 확인하며(check),
+이미 적용한 마이그레이션은 다시 실행하지 않습니다. 적용하지 않은 마이그레이션이 있으면 settings.migrate_on_startup에 따라
+적용하거나 시작을 중단합니다. 배포 전에 aco-book-server 디렉터리에서 직접 적용할 수도 있습니다.
+
+    python -m app.migrations upgrade
+    python -m app.migrations status
+
+upgrade는 DB 잠금(SQLite는 BEGIN IMMEDIATE, PostgreSQL은 advisory lock)을 잡은 한 트랜잭션 안에서 버전을 다시 읽고
+모든 마이그레이션과 버전 기록을 적용합니다. 여러 워커가 동시에 시작해도 한 워커만 적용하고, 나머지는 잠금이 풀린 뒤
+이미 적용된 것을 확인하고 넘어갑니다.
+
+모델을 바꾸면 MIGRATIONS 끝에 그 변경만 적용하는 새 버전을 추가합니다. 마이그레이션은 모델을 참조하지 않고
+만들 때의 정의를 고정해 두며, 주어진 연결(트랜잭션)만 사용해야 합니다. 새 DB와 이전 버전에서 올린 DB는 같은 단계를 거치므로
+스키마가 같습니다. 1번은 마이그레이션 도입 전(baseline)의 스키마로, 그때 create_all로 만든 DB는 버전 0에서 시작해
+1번에서 이미 있는 테이블을 그대로 두고 2번부터 적용합니다.
+"""
+import logging
+import sys
+import time
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn
+
+from app.database.database import utc_now
+
+logger = logging.getLogger(__name__)
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False, default=utc_now),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+# 마이그레이션이 만드는 테이블의 고정된 정의. 모델(app.database)이 바뀌어도 각 버전이 만드는 스키마는 바뀌지 않아야 하므로
+# 모델을 참조하지 않고 해당 마이그레이션 시점의 정의를 그대로 둠. 열거형은 Enum 클래스가 저장하는 이름으로 고정
+_schema = MetaData()
+_currency = Enum("USD", "KRW", "JPY", name="currency", metadata=_schema)
+_asset_type = Enum(
+    "CASH",
+    "CHECKING_ACCOUNT",
+    "SAVINGS_ACCOUNT",
+    "SECURITIES",
+    "INVESTMENT_ACCOUNT",
+    "REAL_ESTATE",
+    "PENSION",
+    "INSURANCE",
+    "OTHER_ASSETS",
+    name="assettype",
+    metadata=_schema,
+)
+
+# 1: 마이그레이션 도입 전(baseline)의 스키마
+_BASELINE_TABLES = [
+    Table(
+        "users",
+        _schema,
+        Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+        Column("username", String, unique=True, index=True),
+        Column("password", String, index=True),
+        Column("email", String, unique=True),
+        Column("full_name", String),
+        Column("nickname", String),
+    ),
+    Table(
+        "user_groups",
+        _schema,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("name", String, unique=True),
+        Column("admin", Integer, ForeignKey("users.id"), nullable=False),
+    ),
+    Table(
+        "user_group_relations",
+        _schema,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+        Column("group_id", Integer, ForeignKey("user_groups.id"), nullable=False),
+        Column("approved", Boolean),
+    ),
+    Table(
+        "assets",
+        _schema,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("owner_group_id", Integer, ForeignKey("user_groups.id"), nullable=False),
+        Column("name", String),
+        Column("asset_type", _asset_type),
+        Column("currency", _currency),
+    ),
+    Table(
+        "asset_records",
+        _schema,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("asset_id", Integer, ForeignKey("assets.id"), nullable=False),
+        Column("date", DateTime, nullable=False),
+        Column("category", String),
+        Column("payment_amount", Float, nullable=False),
+        Column("currency", _currency),
+        Column("approved_amount", Float),
+    ),
+    Table(
+        "financial_records",
+        _schema,
+        Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+        Column("date", DateTime, nullable=False),
+        Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+        Column("category", String),
+        Column("detail", String),
+        Column("asset", String),
+        Column("payment_amount", Float, nullable=False),
+        Column("currency", _currency),
+        Column("approved_amount", Float),
+        Column("note", String),
+    ),
+]
+
+# 3: 잔액 테이블
+_asset_balances = Table(
+    "asset_balances",
+    _schema,
+    Column("asset_id", Integer, ForeignKey("assets.id"), primary_key=True),
+    Column("balance", Float, nullable=False),
+    Column("record_count", Integer, nullable=False),
+)
+_asset_monthly_balances = Table(
+    "asset_monthly_balances",
+    _schema,
+    Column("asset_id", Integer, ForeignKey("assets.id"), primary_key=True),
+    Column("month", String(7), primary_key=True),
+    Column("currency", String(3), primary_key=True),
+    Column("income", Float, nullable=False),
+    Column("expense", Float, nullable=False),
+    Column("net", Float, nullable=False),
+    Column("record_count", Integer, nullable=False),
+)
+
+# 4: 환율
+_exchange_rates = Table(
+    "exchange_rates",
+    _schema,
+    Column("currency", _currency, primary_key=True),
+    Column("date", Date, primary_key=True),
+    Column("rate", Float, nullable=False),
+)
+
+# 5: /sync 삭제 기록
+_deleted_rows = Table(
+    "deleted_rows",
+    _schema,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("table_name", String, nullable=False),
+    Column("row_id", Integer, nullable=False),
+    Column("group_id", Integer, index=True),
+    Column("user_id", Integer, index=True),
+    Column("deleted_at", DateTime, nullable=False, index=True),
+)
+
+# 7: 목록 API ETag용 그룹별 변경 횟수
+_group_versions = Table(
+    "group_versions",
+    _schema,
+    Column("group_id", Integer, primary_key=True),
+    Column("resource", String, primary_key=True),
+    Column("version", Integer, nullable=False),
+)
+
+
+def _add_column(connection: Connection, table_name: str, column: Column) -> None:
+    ddl = CreateColumn(Table(table_name, MetaData(), column).c[column.name]).compile(dialect=connection.dialect)
+    connection.exec_driver_sql(f"ALTER TABLE {table_name} ADD COLUMN {ddl}")
+
+
+def _create_index(connection: Connection, name: str, table_name: str, *columns: str) -> None:
+    # 인덱스 DDL에는 컬럼 이름만 필요하므로 타입 없는 컬럼으로 테이블을 흉내 냄
+    table = Table(table_name, MetaData(), *(Column(column) for column in columns))
+    Index(name, *table.c).create(bind=connection)
+
+
+def _create_baseline(connection: Connection) -> None:
+    # 마이그레이션 도입 전에 create_all로 만든 DB에는 이미 있으므로 없는 테이블만 만듦
+    for enum in (_currency, _asset_type):
+        enum.create(bind=connection, checkfirst=True)
+    _schema.create_all(bind=connection, tables=_BASELINE_TABLES, checkfirst=True)
+
+
+def _create_record_indexes(connection: Connection) -> None:
+    _create_index(connection, "ix_assets_owner_group_id", "assets", "owner_group_id")
+    _create_index(connection, "ix_asset_records_asset_id_date_id", "asset_records", "asset_id", "date", "id")
+
+
+def _create_balances(connection: Connection) -> None:
+    _asset_balances.create(bind=connection)
+    _asset_monthly_balances.create(bind=connection)
+    # 기존 기록으로 잔액을 계산. rebuild는 baseline부터 있던 asset_records 컬럼만 사용함
+    from app.balances import rebuild
+
+    # 연결의 트랜잭션에 합류하므로 rebuild의 commit은 실제로 커밋하지 않음
+    with Session(bind=connection) as session:
+        rebuild(session)
+
+
+def _create_exchange_rates(connection: Connection) -> None:
+    _exchange_rates.create(bind=connection)
+
+
+def _add_sync_tracking(connection: Connection) -> None:
+    # 기존 행은 이 시각에 변경된 것으로 보고 채움. /sync의 (updated_at, id) 커서는 NULL을 다룰 수 없음
+    now = utc_now()
+    for table_name in ("user_groups", "assets", "asset_records"):
+        _add_column(connection, table_name, Column("updated_at", DateTime))
+        connection.execute(text(f"UPDATE {table_name} SET updated_at = :now"), {"now": now})
+        _create_index(connection, f"ix_{table_name}_updated_at", table_name, "updated_at")
+    _deleted_rows.create(bind=connection)
+
+
+def _create_search_index(connection: Connection) -> None:
+    from app.search import create_search_index
+
+    create_search_index(connection)
+
+
+def _create_group_versions(connection: Connection) -> None:
+    _group_versions.create(bind=connection)
+
+
+def _create_record_date_index(connection: Connection) -> None:
+    _create_index(connection, "ix_asset_records_date_id", "asset_records", "date", "id")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "create baseline tables", _create_baseline),
+    Migration(2, "create record pagination indexes", _create_record_indexes),
+    Migration(3, "create and backfill asset balance tables", _create_balances),
+    Migration(4, "create exchange_rates table", _create_exchange_rates),
+    Migration(5, "add updated_at columns and deleted_rows table", _add_sync_tracking),
+    Migration(6, "create full-text search index", _create_search_index),
+    Migration(7, "create group_versions table", _create_group_versions),
+    Migration(8, "create asset_records (date, id) index", _create_record_date_index),
+]
+LATEST_VERSION = MIGRATIONS[-1].version
+
+# 다른 워커가 마이그레이션을 적용하는 동안 기다리는 최대 시간(초)
+LOCK_TIMEOUT = 600.0
+# PostgreSQL advisory lock 키
+_ADVISORY_LOCK_KEY = 0x61636F
+
+
+def _read_version(connection: Connection) -> int:
+    if not inspect(connection).has_table(schema_migrations.name):
+        return 0
+    return connection.execute(select(func.max(schema_migrations.c.version))).scalar() or 0
+
+
+def current_version(engine: Engine) -> int:
+    """DB에 기록된 마지막 마이그레이션 버전입니다. schema_migrations가 없으면 0입니다."""
+    with engine.connect() as connection:
+        return _read_version(connection)
+
+
+def pending_migrations(engine: Engine) -> List[Migration]:
+    version = current_version(engine)
+    return [migration for migration in MIGRATIONS if migration.version > version]
+
+
+def _lock(connection: Connection) -> None:
+    # 트랜잭션이 끝날 때 풀리는 잠금을 잡음
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        connection.exec_driver_sql(f"SELECT pg_advisory_xact_lock({_ADVISORY_LOCK_KEY})")
+    elif dialect == "sqlite":
+        # busy_timeout만큼 기다려도 잠금을 얻지 못하면 다시 시도. 첫 워커의 마이그레이션이 오래 걸릴 수 있음
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                connection.exec_driver_sql("BEGIN IMMEDIATE")
+                return
+            except OperationalError as e:
+                connection.rollback()
+                if "locked" not in str(e) or time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+    else:
+        logger.warning(f"Migrations are not locked on {dialect}; run them from a single process")
+
+
+def upgrade(engine: Engine, target: int = LATEST_VERSION) -> List[Migration]:
+    """적용하지 않은 마이그레이션을 잠금을 잡은 한 트랜잭션에서 target 버전까지 순서대로 적용하고, 적용한 목록을 반환합니다."""
+    with engine.connect() as connection:
+        _lock(connection)
+        _metadata.create_all(bind=connection)
+        # 잠금을 기다리는 동안 다른 워커가 적용했을 수 있으므로 잠금을 잡은 뒤 다시 읽음
+        version = _read_version(connection)
+        applied = []
+        for migration in MIGRATIONS:
+            if migration.version <= version or migration.version > target:
+                continue
+            logger.info(f"Applying migration {migration.version}: {migration.name}")
+            migration.apply(connection)
+            connection.execute(schema_migrations.insert().values(version=migration.version, name=migration.name))
+            applied.append(migration)
+        connection.commit()
+    return applied
+
+
+def check(engine: Engine, apply_pending: bool = True) -> None:
+    """서버 시작 시 스키마 버전을 확인합니다.
+
+    Args:
+        engine (Engine): 확인할 DB
+        apply_pending (bool, optional): 참이면 적용하지 않은 마이그레이션을 적용하고, 거짓이면 RuntimeError를 발생시킴. Defaults to True.
+    """
+    version = current_version(engine)
+    if version >= LATEST_VERSION:
+        return
+    if not apply_pending:
+        raise RuntimeError(
+            f"Database schema is at version {version}, expected {LATEST_VERSION}. "
+            "Run 'python -m app.migrations upgrade'"
+        )
+    upgrade(engine)
+
+
+def main(argv: List[str]) -> int:
+    from app.database import db as database
+
+    if argv == ["upgrade"]:
+        applied = upgrade(database.engine)
+        for migration in applied:
+            print(f"Applied {migration.version}: {migration.name}")
+        print(f"Schema is at version {LATEST_VERSION}")
+        return 0
+    if argv == ["status"]:
+        version = current_version(database.engine)
+        print(f"Schema is at version {version}, latest is {LATEST_VERSION}")
+        for migration in MIGRATIONS:
+            if migration.version > version:
+                print(f"  pending {migration.version}: {migration.name}")
+        return 0
+
+    print("usage: python -m app.migrations {upgrade|status}")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
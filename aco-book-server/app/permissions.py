@@ -0,0 +1,47 @@
+from typing import Dict, FrozenSet, Iterable, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from app.database import Asset, UserGroupRelation
+
+
+class AssetOwner(NamedTuple):
+    id: int
+    owner_group_id: int
+    name: str
+
+
+class UserPermissions:
+    """한 사용자가 속한 그룹 목록을 보관하고 권한 확인을 메모리에서 처리합니다.
+
+    그룹 목록은 요청의 세션마다 한 번 조회하며 다른 요청과 공유하지 않습니다. 워커마다 캐시를 두면 다른 워커에서
+    그룹에서 빠지거나 삭제된 사용자가 캐시가 만료될 때까지 권한 확인을 통과하기 때문입니다.
+    """
+
+    def __init__(self, user_id: int, group_ids: FrozenSet[int]) -> None:
+        self.user_id = user_id
+        self.group_ids = group_ids
+
+    def is_member(self, group_id: Optional[int]) -> bool:
+        return group_id in self.group_ids
+
+    def load_assets(self, db: Session, asset_ids: Iterable[int]) -> Dict[int, AssetOwner]:
+        """여러 자산의 소유 그룹을 쿼리 한 번으로 조회합니다. 존재하지 않는 자산은 결과에 포함되지 않습니다."""
+        asset_ids = set(asset_ids)
+        if not asset_ids:
+            return {}
+        rows = db.query(Asset.id, Asset.owner_group_id, Asset.name).filter(Asset.id.in_(asset_ids)).all()
+        return {row.id: AssetOwner(row.id, row.owner_group_id, row.name) for row in rows}
+
+
+_SESSION_KEY = "user_permissions"
+
+
+def get_user_permissions(db: Session, user_id: int) -> UserPermissions:
+    """사용자의 권한 정보를 반환합니다. 같은 세션(요청) 안에서는 처음 한 번만 조회합니다."""
+    cache: Dict[int, UserPermissions] = db.info.setdefault(_SESSION_KEY, {})
+    permissions = cache.get(user_id)
+    if permissions is None:
+        rows = db.query(UserGroupRelation.group_id).filter(UserGroupRelation.user_id == user_id).all()
+        permissions = cache[user_id] = UserPermissions(user_id, frozenset(row.group_id for row in rows))
+    return permissions
@@ -0,0 +1,142 @@
+"""요청마다 실행한 SQL 개수를 세고, 라우트별 한도(query budget)를 넘으면 경고하거나 예외를 발생시킵니다.
+
+반복문 안에서 행마다 쿼리를 실행하는 N+1 패턴을 새 API에 넣지 않기 위한 장치입니다. 각 라우트는 한도를 선언할 수 있고,
+선언하지 않은 라우트에는 settings.query_budget_default가 적용됩니다.
+
+    @router.get("/assets/", dependencies=[Depends(QueryBudget(8))])
+
+settings.query_budget_mode가 "warn"이면 한도를 넘은 요청을 실행한 SQL과 함께 로그로 남기고,
+"raise"이면 응답 후 QueryBudgetExceeded를 발생시킵니다. 테스트에서는 ACO_QUERY_BUDGET_MODE=raise로 실행하면
+TestClient가 이 예외를 그대로 전달하므로 한도를 넘은 라우트의 테스트가 실패합니다.
+
+SQL은 app.metrics의 엔진 이벤트에서 capture_statements로 받으므로 엔진에 따로 이벤트를 등록하지 않습니다.
+
+함수 단위로 확인할 때는 세션을 넘겨 직접 호출하는 코드를 assert_max_queries로 감쌉니다.
+
+    with assert_max_queries(3):
+        get_user_permissions(session, user_id)
+"""
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.metrics import capture_statements
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_MODES = {"off", "warn", "raise"}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryLog:
+    """count_queries 블록에서 실행된 SQL 목록입니다."""
+
+    __slots__ = ("statements", "max_queries")
+
+    def __init__(self, max_queries: Optional[int] = None) -> None:
+        self.statements: List[str] = []
+        self.max_queries = max_queries
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def exceeded(self) -> bool:
+        return self.max_queries is not None and self.count > self.max_queries
+
+    def describe(self, title: str, limit: int = 10) -> str:
+        """한도 초과 메시지입니다. 같은 SQL을 여러 번 실행했다면 N+1 패턴이므로 횟수가 많은 순으로 보여 줍니다."""
+        lines = [f"{title} ran {self.count} queries (budget {self.max_queries})"]
+        for statement, count in Counter(self.statements).most_common(limit):
+            statement = " ".join(statement.split())
+            lines.append(f"  {count}x {statement[:300]}")
+        return "\n".join(lines)
+
+
+# QueryBudgetMiddleware가 요청마다 만든 기록. QueryBudget 의존성이 한도를 바꿀 대상
+_request_log: ContextVar[Optional[QueryLog]] = ContextVar("request_query_log", default=None)
+
+
+@contextmanager
+def count_queries(max_queries: Optional[int] = None) -> Iterator[QueryLog]:
+    """블록 안에서 app.metrics.instrument_engine으로 등록한 엔진이 실행한 SQL을 기록합니다.
+
+    Args:
+        max_queries (Optional[int], optional): 한도. 기록만 하고 확인은 호출한 쪽에서 합니다. Defaults to None.
+
+    Returns:
+        Iterator[QueryLog]: 블록이 끝날 때까지 SQL이 추가되는 기록
+    """
+    log = QueryLog(max_queries)
+    with capture_statements(log.statements):
+        yield log
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryLog]:
+    """블록 안에서 실행한 SQL이 max_queries개를 넘으면 QueryBudgetExceeded를 발생시킵니다."""
+    with count_queries(max_queries) as log:
+        yield log
+    if log.exceeded:
+        raise QueryBudgetExceeded(log.describe("block"))
+
+
+class QueryBudget:
+    """라우트의 쿼리 한도를 지정하는 의존성입니다.
+
+    요청 컨텍스트에서 실행되도록 async로 선언합니다. QueryBudgetMiddleware가 꺼져 있으면 아무 일도 하지 않습니다.
+
+    Args:
+        max_queries (Optional[int]): 요청 하나가 실행할 수 있는 SQL 개수. None이면 제한 없음(청크 단위로 쓰는 대량 가져오기 등)
+    """
+
+    def __init__(self, max_queries: Optional[int]) -> None:
+        self.max_queries = max_queries
+
+    async def __call__(self) -> None:
+        log = _request_log.get()
+        if log is not None:
+            log.max_queries = self.max_queries
+
+
+class QueryBudgetMiddleware:
+    """요청마다 SQL 개수를 세어 한도를 넘으면 mode에 따라 경고하거나 예외를 발생시키는 미들웨어입니다.
+
+    Args:
+        app (ASGIApp): 감쌀 애플리케이션
+        mode (str, optional): "warn"이면 로그, "raise"이면 QueryBudgetExceeded. Defaults to "warn".
+        default_budget (int, optional): QueryBudget을 선언하지 않은 라우트의 한도. 0이면 제한 없음. Defaults to 30.
+    """
+
+    def __init__(self, app: ASGIApp, mode: str = "warn", default_budget: int = 30) -> None:
+        if mode not in QUERY_BUDGET_MODES - {"off"}:
+            raise ValueError(f"Unknown query budget mode '{mode}'")
+        self.app = app
+        self.mode = mode
+        self.default_budget = default_budget or None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries(self.default_budget) as log:
+            token = _request_log.set(log)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _request_log.reset(token)
+
+        if log.exceeded:
+            message = log.describe(f"{scope['method']} {scope['path']}")
+            if self.mode == "raise":
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
@@ -0,0 +1,44 @@
+"""API 응답의 JSON 인코딩입니다.
+
+orjson이 설치되어 있으면(fastapi[all]에 포함) orjson으로, 없으면 표준 json 모듈로 인코딩합니다.
+두 경우 모두 datetime, date는 ISO 8601 문자열로, Enum은 이름으로 변환하므로 응답 데이터를 미리 문자열로 바꿀 필요가 없습니다.
+"""
+import enum
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from app import metrics
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson이 없는 환경
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.name
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """content를 JSON 바이트열로 인코딩합니다.
+
+    orjson은 Enum을 값으로 인코딩하므로, 이름이 필요한 Enum은 app.serializers처럼 미리 이름으로 바꿔 둡니다.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """dumps로 인코딩하는 JSONResponse입니다. main.py에서 기본 응답 클래스로 지정되어 있습니다."""
+
+    def render(self, content: Any) -> bytes:
+        with metrics.measure("encode"):
+            return dumps(content)
@@ -1,14 +1,26 @@
-from typing import List
+from typing import Dict, List, Literal, Optional
 
-from fastapi import APIRouter, Cookie, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import select
 
-from app.utils import generate_standard_response
-
-from ..auth import verify_token
+from app.balances import remove_assets
+from app.permissions import get_user_permissions
+from app.query_budget import QueryBudget
+from app.responses import FastJSONResponse
+from app.serializers import get_serializer
+from app.sync import add_tombstones
+from app.utils import (
+    ListFormat,
+    check_list_format,
+    generate_arrow_response,
+    generate_standard_response,
+    generate_streaming_response,
+)
+from app.versions import ConditionalGet, bump_group_versions
+
+from ..auth import get_current_user_id
 from ..database import Asset, UserGroupRelation, db
 
 router = APIRouter()
@@ -23,23 +35,35 @@ class DeleteAssetSchema(BaseModel):
     id: List[int]
 
 
-@router.get("/assets/", tags=["assets"], response_class=JSONResponse)
-async def get_all_assets(token: str = Cookie(None), db: Session = Depends(db.get_db)):
-    user_id = verify_token(token)
-
+@router.get("/assets/", tags=["assets"], response_class=FastJSONResponse, dependencies=[Depends(QueryBudget(10))])
+def get_all_assets(
+    stream: Optional[Literal["ndjson", "json"]] = None,
+    format: ListFormat = "rows",
+    version_headers: Dict[str, str] = Depends(ConditionalGet("assets")),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(db.get_db),
+):
+    """사용자가 볼 수 있는 자산 목록을 반환합니다. format=columnar이면 열별 값 목록, format=arrow이면 Arrow IPC 스트림으로 반환합니다."""
+    check_list_format(format, stream)
     user_groups = select(UserGroupRelation.group_id).filter(UserGroupRelation.user_id == user_id).scalar_subquery()
-    assets = db.query(Asset).filter(Asset.owner_group_id.in_(user_groups)).all()
+    query = db.query(*get_serializer(Asset).select_columns).filter(Asset.owner_group_id.in_(user_groups))
+    if stream is not None:
+        response = generate_streaming_response(query.order_by(Asset.id).statement, Asset, db, stream, user_id)
+        response.headers.update(version_headers)
+        return response
 
-    result = generate_standard_response(assets, db_type=Asset, db=db)
-    return JSONResponse(result)
+    assets = query.all()
+    if format == "arrow":
+        return generate_arrow_response(assets, Asset, version_headers)
 
+    result = generate_standard_response(assets, db_type=Asset, db=db, user_id=user_id, columnar=format == "columnar")
+    return FastJSONResponse(result, headers=version_headers)
 
-@router.post("/assets/", tags=["assets"], response_class=JSONResponse)
-async def create_asset(asset_info: AssetSchema, token: str = Cookie(None), db: Session = Depends(db.get_db)):
-    user_id = verify_token(token)
 
-    group_relation = db.query(UserGroupRelation).filter(UserGroupRelation.group_id == asset_info.owner_group_id, UserGroupRelation.user_id == user_id).first()
-    if not group_relation:
+@router.post("/assets/", tags=["assets"], response_class=FastJSONResponse)
+def create_asset(asset_info: AssetSchema, user_id: int = Depends(get_current_user_id), db: Session = Depends(db.get_db)):
+    permissions = get_user_permissions(db, user_id)
+    if not permissions.is_member(asset_info.owner_group_id):
         raise HTTPException(status_code=403, detail="You do not have permission to create an asset for this group")
 
     asset = Asset(
@@ -49,27 +73,30 @@ async def create_asset(asset_info: AssetSchema, token: str = Cookie(None), db: S
         owner_group_id=asset_info.owner_group_id
     )
     db.add(asset)
+    # 기록 목록의 자산 외부키 목록도 바뀜
+    bump_group_versions(db, [asset_info.owner_group_id], "assets", "records")
     db.commit()
     db.refresh(asset)
 
-    return JSONResponse(content={"result": "OK"})
-
+    return FastJSONResponse(content={"result": "OK"})
 
-@router.delete("/assets/", tags=["assets"], response_class=JSONResponse)
-async def delete_asset(targets: DeleteAssetSchema, token: str = Cookie(None), db: Session = Depends(db.get_db)):
-    user_id = verify_token(token)
 
+@router.delete("/assets/", tags=["assets"], response_class=FastJSONResponse, dependencies=[Depends(QueryBudget(15))])
+def delete_asset(targets: DeleteAssetSchema, user_id: int = Depends(get_current_user_id), db: Session = Depends(db.get_db)):
     # Get assets and check if user has permission to delete them
-    assets = db.query(Asset).filter(Asset.id.in_(targets.id)).all()
+    permissions = get_user_permissions(db, user_id)
+    assets = permissions.load_assets(db, targets.id)
     if not assets:
         raise HTTPException(status_code=400, detail="No assets found")
 
-    for asset in assets:
-        group_relation = db.query(UserGroupRelation).filter(UserGroupRelation.group_id == asset.owner_group_id, UserGroupRelation.user_id == user_id).first()
-        if not group_relation:
+    for asset in assets.values():
+        if not permissions.is_member(asset.owner_group_id):
             raise HTTPException(status_code=403, detail=f"You do not have permission to delete the asset: {asset.name}")
 
     db.query(Asset).filter(Asset.id.in_(targets.id)).delete(synchronize_session=False)
+    remove_assets(db, targets.id)
+    add_tombstones(db, Asset.__tablename__, [(asset.id, asset.owner_group_id) for asset in assets.values()])
+    bump_group_versions(db, {asset.owner_group_id for asset in assets.values()}, "assets", "records")
     db.commit()
 
-    return JSONResponse(content={"result": "OK"})
+    return FastJSONResponse(content={"result": "OK"})
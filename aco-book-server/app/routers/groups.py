@@ -1,12 +1,17 @@
-from typing import List
-from fastapi import APIRouter, Cookie, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from typing import Dict, List
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
+from app.permissions import get_user_permissions
+from app.query_budget import QueryBudget
+from app.responses import FastJSONResponse
+from app.serializers import get_serializer
+from app.sync import add_user_tombstones
 from app.utils import generate_standard_response
+from app.versions import ConditionalGet
 
-from ..auth import verify_token
+from ..auth import get_current_user_id
 from ..database import User, UserGroup, UserGroupRelation, db
 
 router = APIRouter()
@@ -17,26 +22,26 @@ class GroupSchema(BaseModel):
 class DeleteGroupSchema(BaseModel):
     id: List[int]
 
-@router.get("/groups/", tags=["groups"], response_class=JSONResponse)
-async def get_all_groups(token: str = Cookie(None), db: Session = Depends(db.get_db)):
-    user_id = verify_token(token)
-
+@router.get("/groups/", tags=["groups"], response_class=FastJSONResponse, dependencies=[Depends(QueryBudget(10))])
+def get_all_groups(
+    version_headers: Dict[str, str] = Depends(ConditionalGet("groups")),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(db.get_db),
+):
     groups = (
-        db.query(UserGroup)
+        db.query(*get_serializer(UserGroup).select_columns)
         .join(UserGroupRelation, UserGroupRelation.group_id == UserGroup.id)
         .filter(UserGroupRelation.user_id == user_id)
         .all()
     )
 
     result = generate_standard_response(groups, UserGroup)
-    return result
+    return FastJSONResponse(result, headers=version_headers)
 
-@router.post("/groups/", tags=["groups"], response_class=JSONResponse)
-async def create_group(
-    group_info: GroupSchema, token: str = Cookie(None), db: Session = Depends(db.get_db)
+@router.post("/groups/", tags=["groups"], response_class=FastJSONResponse)
+def create_group(
+    group_info: GroupSchema, user_id: int = Depends(get_current_user_id), db: Session = Depends(db.get_db)
 ):
-    user_id = verify_token(token)
-
     group = UserGroup(name=group_info.name, admin=user_id)
     db.add(group)
     db.commit()
@@ -49,12 +54,10 @@ async def create_group(
     db.commit()
     db.refresh(relation)
 
-    return JSONResponse(content={"result": "OK"})
-
-@router.delete("/groups/", tags=["groups"], response_class=JSONResponse)
-async def delete_group(targets: DeleteGroupSchema, token: str = Cookie(None), db: Session = Depends(db.get_db)):
-    user_id = verify_token(token)
+    return FastJSONResponse(content={"result": "OK"})
 
+@router.delete("/groups/", tags=["groups"], response_class=FastJSONResponse)
+def delete_group(targets: DeleteGroupSchema, user_id: int = Depends(get_current_user_id), db: Session = Depends(db.get_db)):
     groups = db.query(UserGroup).filter(UserGroup.id.in_(targets.id)).all()
     if not groups:
         raise HTTPException(status_code=400, detail="No groups found")
@@ -64,36 +67,33 @@ async def delete_group(targets: DeleteGroupSchema, token: str = Cookie(None), db
             if group.admin != user_id:
                 raise HTTPException(status_code=403, detail=f"You do not have permission to delete the group: {group.name}")
 
+        members = (
+            db.query(UserGroupRelation.user_id, UserGroupRelation.group_id)
+            .filter(UserGroupRelation.group_id.in_(targets.id))
+            .all()
+        )
         db.query(UserGroupRelation).filter(UserGroupRelation.group_id.in_(targets.id)).delete(synchronize_session=False)
         db.query(UserGroup).filter(UserGroup.id.in_(targets.id)).delete(synchronize_session=False)
+        add_user_tombstones(db, UserGroup.__tablename__, [(member.group_id, member.user_id) for member in members])
         db.commit()
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
     
-    return JSONResponse(content={"result": "OK"})
+    return FastJSONResponse(content={"result": "OK"})
 
 
-@router.get("/groups/{group_id}/members", tags=["groups"], response_class=JSONResponse)
-async def get_group_users_info(
-    group_id: int, token: str = Cookie(None), db: Session = Depends(db.get_db)
+@router.get("/groups/{group_id}/members", tags=["groups"], response_class=FastJSONResponse)
+def get_group_users_info(
+    group_id: int, user_id: int = Depends(get_current_user_id), db: Session = Depends(db.get_db)
 ):
-    user_id = verify_token(token)
-
     # Check if the group exists
     group = db.query(UserGroup).filter(UserGroup.id == group_id).first()
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
 
     # Check if the user is a member of the group
-    member_check = (
-        db.query(UserGroupRelation)
-        .filter(
-            UserGroupRelation.group_id == group_id, UserGroupRelation.user_id == user_id
-        )
-        .first()
-    )
-    if not member_check:
+    if not get_user_permissions(db, user_id).is_member(group_id):
         raise HTTPException(
             status_code=403,
             detail="You do not have permission to view this group's members",
@@ -1,18 +1,45 @@
+import json
+import logging
+import time
+import zipfile
 from datetime import datetime, timezone
-from typing import List, Optional, Union
+from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple, Union
 
-import pandas as pd
-from fastapi import APIRouter, Cookie, Depends, HTTPException, Request
-from fastapi.responses import FileResponse, JSONResponse
-from pydantic import BaseModel, validator
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, ValidationError, validator
+from sqlalchemy import and_, insert, or_
+from sqlalchemy.orm import Query as SQLQuery, Session
 from sqlalchemy.sql import select
 
-from app.utils import generate_standard_response, parse_datetime
+from app.balances import apply_record_changes
+from app.currency import convert_record_batches, get_rate_table, validate_currency
+from app.exporters import EXPORT_FORMATS, is_format_available
+from app.importers import chunked, iter_csv_rows, iter_record_items, iter_xlsx_rows
+from app.permissions import UserPermissions, get_user_permissions
+from app.query_budget import QueryBudget
+from app.responses import FastJSONResponse
+from app.search import decode_rank_cursor, encode_rank_cursor, has_search_index, like_condition, match_subquery, parse_search_terms
+from app.serializers import get_serializer
+from app.sync import add_tombstones
+from app.utils import (
+    ListFormat,
+    check_list_format,
+    decode_cursor,
+    encode_cursor,
+    generate_arrow_response,
+    generate_standard_response,
+    generate_streaming_response,
+    iter_serialized_batches,
+    parse_datetime,
+)
+from app.versions import ConditionalGet, bump_group_versions
 
-from ..auth import verify_token
+from ..auth import get_current_user_id
 from ..database import Asset, AssetRecord, UserGroupRelation, db
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 class AssetRecordSchema(BaseModel):
@@ -31,88 +58,462 @@ class AssetRecordSchema(BaseModel):
             result = parse_datetime(val)
             return result
 
+    @validator("currency")
+    def check_currency(cls, val):
+        # Enum(Currency) 컬럼은 모르는 값도 그대로 저장하고 읽을 때 실패하므로 저장 전에 거부
+        return validate_currency(val)
+
+    def to_values(self) -> Dict[str, Any]:
+        approved_amount = self.approved_amount if self.approved_amount is not None else self.payment_amount
+        return {
+            "asset_id": self.asset_id,
+            "date": self.date,
+            "category": self.category,
+            "payment_amount": self.payment_amount,
+            "currency": self.currency,
+            "approved_amount": approved_amount,
+        }
+
 class DeleteAssetRecordSchema(BaseModel):
     id: List[int]
 
+class RecordFilterSchema(BaseModel):
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    asset_id: Optional[int] = None
+    category: Optional[str] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+
+    @validator("start_date", "end_date", pre=True)
+    def parse_date(cls, val):
+        if isinstance(val, (int, str)):
+            return parse_datetime(val)
+        return val
+
 
-@router.get("/records/", tags=["records"], response_class=JSONResponse)
-async def get_all_records(token: str = Cookie(None), db: Session = Depends(db.get_db)):
-    user_id = verify_token(token)
+def filter_records(query: SQLQuery, user_id: int, filters: RecordFilterSchema, use_asset_index: bool = True) -> SQLQuery:
+    """사용자가 속한 그룹의 자산 기록으로 쿼리를 제한하고 조회 조건을 적용합니다.
 
+    Args:
+        query (SQLQuery): AssetRecord를 조회하는 쿼리
+        user_id (int): 요청한 사용자 ID
+        filters (RecordFilterSchema): 조회 조건
+        use_asset_index (bool, optional): 거짓이면 사용자 자산 조건에 asset_id 인덱스를 사용하지 않음. 자산마다 인덱스를 찾으면
+            모든 기록을 읽고 정렬한 뒤에야 limit을 적용하므로, (date, id)나 updated_at 순서로 일부만 읽는 쿼리는 거짓으로 호출해
+            정렬 순서의 인덱스를 훑으며 자산을 확인하게 합니다. Defaults to True.
+
+    Returns:
+        SQLQuery: 조건이 적용된 쿼리
+    """
     user_groups = select(UserGroupRelation.group_id).filter(UserGroupRelation.user_id == user_id).scalar_subquery()
-    records = db.query(AssetRecord).join(Asset, AssetRecord.asset_id == Asset.id).filter(Asset.owner_group_id.in_(user_groups)).all()
+    user_assets = select(Asset.id).filter(Asset.owner_group_id.in_(user_groups)).scalar_subquery()
+    # asset_id + 0은 값이 같지만 인덱스를 사용할 수 없는 식
+    asset_id = AssetRecord.asset_id if use_asset_index else AssetRecord.asset_id + 0
+    query = query.filter(asset_id.in_(user_assets))
+
+    if filters.asset_id is not None:
+        query = query.filter(AssetRecord.asset_id == filters.asset_id)
+    if filters.start_date is not None:
+        query = query.filter(AssetRecord.date >= filters.start_date)
+    if filters.end_date is not None:
+        query = query.filter(AssetRecord.date <= filters.end_date)
+    if filters.category is not None:
+        query = query.filter(AssetRecord.category == filters.category)
+    if filters.min_amount is not None:
+        query = query.filter(AssetRecord.payment_amount >= filters.min_amount)
+    if filters.max_amount is not None:
+        query = query.filter(AssetRecord.payment_amount <= filters.max_amount)
+
+    return query
+
+
+def paginate_records(query: SQLQuery, cursor: Optional[str], limit: int) -> SQLQuery:
+    """(date, id) 내림차순 키셋 페이지네이션을 적용합니다. 다음 페이지 존재 여부 확인을 위해 limit + 1개를 조회합니다."""
+    if cursor is not None:
+        try:
+            cursor_date, cursor_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.filter(
+            or_(
+                AssetRecord.date < cursor_date,
+                and_(AssetRecord.date == cursor_date, AssetRecord.id < cursor_id),
+            )
+        )
+
+    return query.order_by(AssetRecord.date.desc(), AssetRecord.id.desc()).limit(limit + 1)
+
+
+@router.get("/records/", tags=["records"], response_class=FastJSONResponse, dependencies=[Depends(QueryBudget(10))])
+def get_all_records(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    stream: Optional[Literal["ndjson", "json"]] = None,
+    format: ListFormat = "rows",
+    filters: RecordFilterSchema = Depends(),
+    version_headers: Dict[str, str] = Depends(ConditionalGet("records")),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(db.get_db),
+):
+    """조건에 맞는 기록을 최신순으로 limit개씩 반환합니다. 다음 페이지는 next_cursor를 cursor로 전달해 조회합니다.
+
+    format=columnar이면 data를 열별 값 목록으로, format=arrow이면 Arrow IPC 스트림으로 반환하며 이때 다음 커서는 X-Next-Cursor 헤더로 전달합니다.
+    """
+    check_list_format(format, stream)
+    query = filter_records(db.query(*get_serializer(AssetRecord).select_columns), user_id, filters, use_asset_index=False)
+    if stream is not None:
+        # 스트리밍 모드는 대량 내보내기 용도이므로 페이지네이션 없이 조건에 맞는 모든 기록을 전송
+        statement = query.order_by(AssetRecord.date.desc(), AssetRecord.id.desc()).statement
+        response = generate_streaming_response(statement, AssetRecord, db, stream, user_id)
+        response.headers.update(version_headers)
+        return response
+
+    records = paginate_records(query, cursor, limit).all()
 
-    result = generate_standard_response(records, db_type=AssetRecord, db=db)
-    
-    return JSONResponse(result)
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = encode_cursor(records[-1].date, records[-1].id)
 
+    return records_page_response(records, next_cursor, format, db, user_id, version_headers)
 
-@router.post("/records/", tags=["records"], response_class=JSONResponse)
-async def create_record(record_info: AssetRecordSchema, token: str = Cookie(None), db: Session = Depends(db.get_db)):
-    user_id = verify_token(token)
 
+def records_page_response(
+    records: List[Any], next_cursor: Optional[str], format: ListFormat, db: Session, user_id: int, headers: Dict[str, str]
+) -> Response:
+    if format == "arrow":
+        headers = dict(headers)
+        if next_cursor is not None:
+            headers["X-Next-Cursor"] = next_cursor
+        return generate_arrow_response(records, AssetRecord, headers)
+
+    result = generate_standard_response(records, db_type=AssetRecord, db=db, user_id=user_id, columnar=format == "columnar")
+    result["next_cursor"] = next_cursor
+
+    return FastJSONResponse(result, headers=headers)
+
+
+@router.get("/records/search", tags=["records"], response_class=FastJSONResponse, dependencies=[Depends(QueryBudget(10))])
+def search_records(
+    q: str = Query(..., min_length=1),
+    order: Literal["rank", "date"] = "rank",
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    format: ListFormat = "rows",
+    filters: RecordFilterSchema = Depends(),
+    version_headers: Dict[str, str] = Depends(ConditionalGet("records")),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(db.get_db),
+):
+    """분류(category)에 q의 모든 단어로 시작하는 단어가 있는 기록을 검색합니다. 예) q=coff sh 는 "Coffee Shop"과 일치
+
+    order=rank이면 관련도 순, order=date이면 /records/와 같은 최신순으로 반환하며 페이지네이션과 format은 /records/와 같습니다.
+    관련도는 전체 기록을 기준으로 계산되므로, 페이지를 넘기는 사이에 기록이 바뀌면 순서가 달라질 수 있습니다.
+    """
+    check_list_format(format)
+    terms = parse_search_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query has no words")
+
+    query = db.query(*get_serializer(AssetRecord).select_columns)
+    if not has_search_index(db):
+        # 전문 검색 색인이 없으면 관련도를 계산할 수 없으므로 최신순으로 LIKE 검색
+        order = "date"
+        query = query.filter(like_condition(terms))
+    else:
+        matches = match_subquery(terms)
+        query = query.join(matches, matches.c.id == AssetRecord.id)
+        if order == "rank":
+            query = query.add_columns(matches.c.rank)
+    query = filter_records(query, user_id, filters)
+
+    if order == "date":
+        records = paginate_records(query, cursor, limit).all()
+    else:
+        if cursor is not None:
+            try:
+                cursor_rank, cursor_id = decode_rank_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            query = query.filter(
+                or_(
+                    matches.c.rank > cursor_rank,
+                    and_(matches.c.rank == cursor_rank, AssetRecord.id < cursor_id),
+                )
+            )
+        records = query.order_by(matches.c.rank, AssetRecord.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        last = records[-1]
+        next_cursor = encode_rank_cursor(last.rank, last.id) if order == "rank" else encode_cursor(last.date, last.id)
+
+    return records_page_response(records, next_cursor, format, db, user_id, version_headers)
+
+
+@router.post("/records/", tags=["records"], response_class=FastJSONResponse)
+def create_record(record_info: AssetRecordSchema, user_id: int = Depends(get_current_user_id), db: Session = Depends(db.get_db)):
     # Verify the user is a member of the group owning the asset
-    asset = db.query(Asset).filter(Asset.id == record_info.asset_id).first()
+    permissions = get_user_permissions(db, user_id)
+    asset = permissions.load_assets(db, [record_info.asset_id]).get(record_info.asset_id)
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
 
-    group_relation = db.query(UserGroupRelation).filter(UserGroupRelation.group_id == asset.owner_group_id, UserGroupRelation.user_id == user_id).first()
-    if not group_relation:
+    if not permissions.is_member(asset.owner_group_id):
         raise HTTPException(status_code=403, detail="You do not have permission to create a record for this asset")
 
-    approved_amount = record_info.approved_amount if record_info.approved_amount is not None else record_info.payment_amount
-    record = AssetRecord(
-        asset_id=record_info.asset_id,
-        date=record_info.date,
-        category=record_info.category,
-        payment_amount=record_info.payment_amount,
-        currency=record_info.currency,
-        approved_amount=approved_amount
-    )
+    values = record_info.to_values()
+    record = AssetRecord(**values)
     db.add(record)
+    apply_record_changes(db, [values])
+    bump_group_versions(db, [asset.owner_group_id], "records")
     db.commit()
     db.refresh(record)
 
-    return JSONResponse(content={"result": "OK"})
+    return FastJSONResponse(content={"result": "OK"})
+
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in error.errors())
+
+
+def validate_record_rows(
+    db: Session, permissions: UserPermissions, items: Iterable[Tuple[int, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """여러 행을 AssetRecordSchema로 검증하고 자산 권한을 쿼리 한 번으로 확인합니다.
 
+    Args:
+        db (Session): DB 세션
+        permissions (UserPermissions): 요청한 사용자의 권한 정보
+        items (Iterable[Tuple[int, Any]]): (행 번호, 원본 데이터) 목록. 원본 데이터가 예외이면 해당 행의 오류로 기록합니다.
 
-@router.delete("/records/", tags=["records"], response_class=JSONResponse)
-async def delete_record(targets: DeleteAssetRecordSchema, token: str = Cookie(None), db: Session = Depends(db.get_db)):
-    user_id = verify_token(token)
+    Returns:
+        Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: AssetRecord에 삽입할 값 목록과 {"index", "detail"} 형태의 행별 오류 목록
+    """
+    candidates: List[Tuple[int, Dict[str, Any]]] = []
+    errors: List[Dict[str, Any]] = []
+    for index, item in items:
+        if isinstance(item, Exception):
+            errors.append({"index": index, "detail": str(item)})
+            continue
+        try:
+            candidates.append((index, AssetRecordSchema.model_validate(item).to_values()))
+        except ValidationError as e:
+            errors.append({"index": index, "detail": format_validation_error(e)})
 
+    assets = permissions.load_assets(db, {values["asset_id"] for _, values in candidates})
+    rows = []
+    for index, values in candidates:
+        asset = assets.get(values["asset_id"])
+        if not asset:
+            errors.append({"index": index, "detail": "Asset not found"})
+        elif not permissions.is_member(asset.owner_group_id):
+            errors.append({"index": index, "detail": f"You do not have permission to create a record for asset: {asset.name}"})
+        else:
+            rows.append(values)
+
+    errors.sort(key=lambda error: error["index"])
+    return rows, errors
+
+
+def insert_record_rows(db: Session, rows: List[Dict[str, Any]], chunk_size: int) -> None:
+    """검증된 행을 chunk_size 단위의 executemany로 삽입합니다. 커밋은 호출한 쪽에서 한 번만 수행합니다."""
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        db.execute(insert(AssetRecord), chunk)
+        apply_record_changes(db, chunk)
+
+
+async def read_bulk_items(request: Request) -> List[Tuple[int, Any]]:
+    # NDJSON은 한 줄씩 읽어 파싱하고, 그 외에는 JSON 배열로 처리
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        items = []
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    items.append(parse_ndjson_line(len(items), line))
+        if buffer.strip():
+            items.append(parse_ndjson_line(len(items), buffer))
+        return items
+
+    try:
+        body = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body is not valid JSON")
+    if not isinstance(body, list):
+        raise HTTPException(status_code=400, detail="Request body must be a JSON array of records")
+    return list(enumerate(body))
+
+
+def parse_ndjson_line(index: int, line: bytes) -> Tuple[int, Any]:
+    try:
+        return index, json.loads(line)
+    except ValueError as e:
+        return index, ValueError(f"Invalid JSON: {e}")
+
+
+def save_bulk_records(
+    db: Session, user_id: int, items: List[Tuple[int, Any]], chunk_size: int
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    permissions = get_user_permissions(db, user_id)
+    rows, errors = validate_record_rows(db, permissions, items)
+
+    try:
+        insert_record_rows(db, rows, chunk_size)
+        # 행마다 자산의 그룹을 다시 찾지 않고 요청한 사용자가 속한 모든 그룹의 버전을 갱신
+        if rows:
+            bump_group_versions(db, permissions.group_ids, "records")
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
+
+    return rows, errors
+
+
+@router.post("/records/bulk", tags=["records"], response_class=FastJSONResponse, dependencies=[Depends(QueryBudget(None))])
+async def create_records_bulk(
+    request: Request,
+    chunk_size: int = Query(1000, ge=1, le=10000),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(db.get_db),
+):
+    """JSON 배열 또는 NDJSON(Content-Type: application/x-ndjson)으로 여러 기록을 한 트랜잭션에 추가합니다.
+
+    검증에 실패한 행은 건너뛰고 errors에 행 번호와 함께 반환합니다.
+    """
+    began = time.perf_counter()
+    items = await read_bulk_items(request)
+    # 요청 본문은 비동기로 읽고, DB 작업은 이벤트 루프를 막지 않도록 스레드 풀에서 실행
+    rows, errors = await run_in_threadpool(save_bulk_records, db, user_id, items, chunk_size)
+
+    elapsed = time.perf_counter() - began
+    logger.debug(f"Bulk inserted {len(rows)} records in {elapsed:.3f}s ({len(rows) / max(elapsed, 1e-9):.0f} rows/s)")
+
+    return FastJSONResponse(content={"result": "OK", "inserted": len(rows), "errors": errors})
+
+
+@router.post("/records/import", tags=["records"], response_class=FastJSONResponse, dependencies=[Depends(QueryBudget(None))])
+def import_records(
+    file: UploadFile = File(...),
+    asset_id: Optional[int] = Form(None),
+    currency: Optional[str] = Form(None),
+    chunk_size: int = Query(1000, ge=1, le=10000),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(db.get_db),
+):
+    """CSV 또는 XLSX 파일의 기록을 chunk_size 행씩 읽어 한 트랜잭션에 추가합니다.
+
+    첫 행은 AssetRecordSchema의 필드 이름과 같은 헤더여야 하며, asset_id, currency 열이 없으면 폼 값을 사용합니다.
+    오류의 index는 파일에서의 행 번호입니다.
+    """
+    filename = (file.filename or "").lower()
+    if filename.endswith(".xlsx"):
+        rows = iter_xlsx_rows(file.file)
+    elif filename.endswith(".csv") or file.content_type == "text/csv":
+        rows = iter_csv_rows(file.file)
+    else:
+        raise HTTPException(status_code=400, detail="Only .csv and .xlsx files are supported")
+
+    defaults = {key: value for key, value in {"asset_id": asset_id, "currency": currency}.items() if value is not None}
+    items = iter_record_items(rows, AssetRecordSchema.model_fields.keys(), defaults)
+    permissions = get_user_permissions(db, user_id)
+
+    began = time.perf_counter()
+    inserted = 0
+    errors = []
+    try:
+        for chunk in chunked(items, chunk_size):
+            chunk_rows, chunk_errors = validate_record_rows(db, permissions, chunk)
+            insert_record_rows(db, chunk_rows, chunk_size)
+            inserted += len(chunk_rows)
+            errors.extend(chunk_errors)
+        if inserted:
+            bump_group_versions(db, permissions.group_ids, "records")
+        db.commit()
+    except (ValueError, KeyError, zipfile.BadZipFile) as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Could not read the file: {e}")
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
+
+    elapsed = time.perf_counter() - began
+    logger.debug(f"Imported {inserted} records in {elapsed:.3f}s ({inserted / max(elapsed, 1e-9):.0f} rows/s)")
+
+    return FastJSONResponse(content={"result": "OK", "inserted": inserted, "errors": errors})
+
+
+@router.delete("/records/", tags=["records"], response_class=FastJSONResponse, dependencies=[Depends(QueryBudget(15))])
+def delete_record(targets: DeleteAssetRecordSchema, user_id: int = Depends(get_current_user_id), db: Session = Depends(db.get_db)):
     # Get records and check if user has permission to delete them
-    records = db.query(AssetRecord).filter(AssetRecord.id.in_(targets.id)).all()
+    permissions = get_user_permissions(db, user_id)
+    records = (
+        db.query(AssetRecord.id, AssetRecord.asset_id, AssetRecord.date, AssetRecord.payment_amount, AssetRecord.currency)
+        .filter(AssetRecord.id.in_(targets.id))
+        .all()
+    )
     if not records:
         raise HTTPException(status_code=400, detail="No records found")
 
-    for record in records:
-        asset = db.query(Asset).filter(Asset.id == record.asset_id).first()
+    asset_ids = {record.asset_id for record in records}
+    assets = permissions.load_assets(db, asset_ids)
+    for asset_id in asset_ids:
+        asset = assets.get(asset_id)
         if not asset:
             raise HTTPException(status_code=404, detail="Asset not found")
 
-        group_relation = db.query(UserGroupRelation).filter(UserGroupRelation.group_id == asset.owner_group_id, UserGroupRelation.user_id == user_id).first()
-        if not group_relation:
+        if not permissions.is_member(asset.owner_group_id):
             raise HTTPException(status_code=403, detail=f"You do not have permission to delete the record for asset: {asset.name}")
 
     db.query(AssetRecord).filter(AssetRecord.id.in_(targets.id)).delete(synchronize_session=False)
+    apply_record_changes(db, [record._mapping for record in records], sign=-1)
+    add_tombstones(db, AssetRecord.__tablename__, [(record.id, assets[record.asset_id].owner_group_id) for record in records])
+    bump_group_versions(db, {asset.owner_group_id for asset in assets.values()}, "records")
     db.commit()
 
-    return JSONResponse(content={"result": "OK"})
+    return FastJSONResponse(content={"result": "OK"})
 
 # --------------------------------------------
 
-@router.get("/records/export", tags=["records"], response_class=FileResponse)
-async def export_data(token: str = Cookie(None), db: Session = Depends(db.get_db)):
-    user_id = verify_token(token)
-
-    user_groups = select(UserGroupRelation.group_id).filter(UserGroupRelation.user_id == user_id).scalar_subquery()
-    records = db.query(AssetRecord).join(Asset, AssetRecord.asset_id == Asset.id).filter(Asset.owner_group_id.in_(user_groups)).all()
+@router.get("/records/export", tags=["records"], response_class=StreamingResponse)
+def export_data(
+    format: Literal["xlsx", "csv", "ndjson", "parquet", "arrow"] = "xlsx",
+    currency: Optional[str] = None,
+    filters: RecordFilterSchema = Depends(),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(db.get_db),
+):
+    export_format = EXPORT_FORMATS[format]
+    if not is_format_available(export_format):
+        raise HTTPException(status_code=400, detail=f"Export format '{format}' requires {export_format.requires} to be installed")
 
-    result = generate_standard_response(records, db_type=AssetRecord, db=db)
-    df = pd.DataFrame(result["data"])
-    
-    file_path = f"./output/export_{user_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}.xlsx"
-    df.to_excel(file_path, index=False)
+    query = filter_records(db.query(*get_serializer(AssetRecord).select_columns), user_id, filters)
+    statement = query.order_by(AssetRecord.date.desc(), AssetRecord.id.desc()).statement
+    batches = iter_serialized_batches(statement, AssetRecord, db)
+    if currency is not None:
+        # 금액을 기록 날짜의 환율로 currency로 환산해 내보냄
+        # 스트리밍이 시작된 뒤에는 오류를 응답할 수 없으므로 내보낼 기록의 모든 통화에 환율이 있는지 미리 확인
+        try:
+            validate_currency(currency)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        rates = get_rate_table(db)
+        sources = {row.currency.name for row in query.with_entities(AssetRecord.currency).distinct() if row.currency is not None}
+        missing = sorted(code for code in sources | {currency} if not rates.has_currency(code))
+        if missing:
+            raise HTTPException(status_code=400, detail=f"No exchange rate for {', '.join(missing)}")
+        batches = convert_record_batches(batches, rates, currency)
 
-    # 파일을 반환
-    return FileResponse(path=file_path, filename=file_path, media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    # 파일을 저장하지 않고 서버 측 커서에서 읽는 대로 변환해 전송
+    filename = f"export_{user_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}.{export_format.extension}"
+    return StreamingResponse(
+        export_format.write(batches, AssetRecord),
+        media_type=export_format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -9,6 +9,7 @@ import logging
 
 from ..auth import verify_token
 from ..database import Currency, FinancialRecord, User, db
+from ..utils import parse_datetime
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -26,14 +27,9 @@ class RecordBaseSchema(BaseModel):
 
     @validator("date", pre=True, always=True)
     def parse_date(cls, val):
-        if isinstance(val, int):
-            return datetime.fromtimestamp(val, timezone.utc)
-
-        if isinstance(val, str):
+        if isinstance(val, (int, str)):
             try:
-                return datetime.strptime(val, "%Y-%m-%dT%H:%M:%S.%fZ").replace(
-                    tzinfo=timezone.utc
-                )
+                return parse_datetime(val)
             except ValueError:
                 raise ValueError("Invalid date format")
 
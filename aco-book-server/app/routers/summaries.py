@@ -0,0 +1,188 @@
+import enum
+from datetime import date
+from typing import Any, Dict, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import select
+
+from app.currency import MissingRateError, RateTable, get_rate_table, validate_currency
+from app.responses import FastJSONResponse
+from app.utils import day_of, generate_standard_response, month_of
+
+from ..auth import get_current_user_id
+from ..database import Asset, AssetBalance, AssetMonthlyBalance, AssetRecord, UserGroupRelation, db
+from .records import RecordFilterSchema, filter_records
+
+router = APIRouter()
+
+SummaryKey = Literal["asset", "category", "month", "group"]
+SUMMARY_VALUES = ("income", "expense", "net", "record_count")
+
+
+def summary_rows_to_dicts(rows) -> List[Dict[str, Any]]:
+    return [
+        {key: value.name if isinstance(value, enum.Enum) else value for key, value in row._asdict().items()}
+        for row in rows
+    ]
+
+
+def get_target_rates(db: Session, currency: str) -> RateTable:
+    try:
+        validate_currency(currency)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return get_rate_table(db)
+
+
+@router.get("/summary/balances", tags=["summary"], response_class=FastJSONResponse)
+def get_asset_balances(currency: Optional[str] = None, user_id: int = Depends(get_current_user_id), db: Session = Depends(db.get_db)):
+    """사용자가 볼 수 있는 자산별 잔액(payment_amount 합계)과 기록 수를 반환합니다. asset_balances에서 바로 읽습니다.
+
+    currency를 지정하면 오늘 환율로 환산한 잔액을 반환합니다.
+    """
+    user_groups = select(UserGroupRelation.group_id).filter(UserGroupRelation.user_id == user_id).scalar_subquery()
+    rows = (
+        db.query(
+            Asset.id.label("asset_id"),
+            Asset.name,
+            Asset.owner_group_id,
+            Asset.currency,
+            func.coalesce(AssetBalance.balance, 0).label("balance"),
+            func.coalesce(AssetBalance.record_count, 0).label("record_count"),
+        )
+        .outerjoin(AssetBalance, AssetBalance.asset_id == Asset.id)
+        .filter(Asset.owner_group_id.in_(user_groups))
+        .order_by(Asset.id)
+        .all()
+    )
+    balances = summary_rows_to_dicts(rows)
+
+    if currency is not None:
+        rates = get_target_rates(db, currency)
+        today = date.today()
+        try:
+            for balance in balances:
+                if balance["currency"] is not None:
+                    balance["balance"] *= rates.rate(balance["currency"], today) / rates.rate(currency, today)
+                    balance["currency"] = currency
+        except MissingRateError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return FastJSONResponse(generate_standard_response(balances))
+
+
+def query_record_totals(
+    db: Session, user_id: int, by: List[SummaryKey], filters: RecordFilterSchema, extra_keys: Optional[List[Any]] = None
+):
+    keys = []
+    for key in dict.fromkeys(by):
+        if key == "asset":
+            keys.append(AssetRecord.asset_id.label("asset_id"))
+        elif key == "category":
+            keys.append(AssetRecord.category.label("category"))
+        elif key == "month":
+            keys.append(month_of(db, AssetRecord.date).label("month"))
+        elif key == "group":
+            keys.append(Asset.owner_group_id.label("group_id"))
+    # 통화가 다른 금액은 더할 수 없으므로 항상 통화별로 나눔
+    keys.append(AssetRecord.currency.label("currency"))
+    keys.extend(extra_keys or [])
+
+    amount = AssetRecord.payment_amount
+    query = db.query(
+        *keys,
+        func.sum(case((amount > 0, amount), else_=0)).label("income"),
+        func.sum(case((amount < 0, amount), else_=0)).label("expense"),
+        func.sum(amount).label("net"),
+        func.count(AssetRecord.id).label("record_count"),
+    ).select_from(AssetRecord)
+    if "group" in by:
+        query = query.join(Asset, AssetRecord.asset_id == Asset.id)
+
+    query = filter_records(query, user_id, filters)
+    return query.group_by(*keys).order_by(*keys).all()
+
+
+def query_converted_totals(
+    db: Session, user_id: int, by: List[SummaryKey], filters: RecordFilterSchema, rates: RateTable, currency: str
+) -> List[Dict[str, Any]]:
+    # 날짜별로 합산한 결과를 한 번에 환산한 뒤 by 기준으로 다시 합산
+    rows = summary_rows_to_dicts(query_record_totals(db, user_id, by, filters, [day_of(db, AssetRecord.date).label("day")]))
+    try:
+        factors = rates.conversion_factors([row["currency"] for row in rows], [row["day"] for row in rows], currency)
+    except MissingRateError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    key_names = [name for name in (rows[0].keys() if rows else []) if name not in SUMMARY_VALUES + ("currency", "day")]
+    totals: Dict[tuple, Dict[str, Any]] = {}
+    for row, factor in zip(rows, factors.tolist()):
+        key = tuple(row[name] for name in key_names)
+        total = totals.get(key)
+        if total is None:
+            total = {name: row[name] for name in key_names}
+            total.update(currency=currency, income=0.0, expense=0.0, net=0.0, record_count=0)
+            totals[key] = total
+        total["income"] += row["income"] * factor
+        total["expense"] += row["expense"] * factor
+        total["net"] += row["net"] * factor
+        total["record_count"] += row["record_count"]
+
+    return list(totals.values())
+
+
+def query_monthly_totals(db: Session, user_id: int, by: List[SummaryKey]):
+    # 조건 없이 자산, 월, 그룹 기준으로만 묶을 때는 asset_monthly_balances를 합산
+    user_groups = select(UserGroupRelation.group_id).filter(UserGroupRelation.user_id == user_id).scalar_subquery()
+
+    keys = []
+    for key in dict.fromkeys(by):
+        if key == "asset":
+            keys.append(AssetMonthlyBalance.asset_id.label("asset_id"))
+        elif key == "month":
+            keys.append(AssetMonthlyBalance.month.label("month"))
+        elif key == "group":
+            keys.append(Asset.owner_group_id.label("group_id"))
+    keys.append(func.nullif(AssetMonthlyBalance.currency, "").label("currency"))
+
+    return (
+        db.query(
+            *keys,
+            func.sum(AssetMonthlyBalance.income).label("income"),
+            func.sum(AssetMonthlyBalance.expense).label("expense"),
+            func.sum(AssetMonthlyBalance.net).label("net"),
+            func.sum(AssetMonthlyBalance.record_count).label("record_count"),
+        )
+        .join(Asset, AssetMonthlyBalance.asset_id == Asset.id)
+        .filter(Asset.owner_group_id.in_(user_groups), AssetMonthlyBalance.record_count != 0)
+        .group_by(*keys)
+        .order_by(*keys)
+        .all()
+    )
+
+
+@router.get("/summary/totals", tags=["summary"], response_class=FastJSONResponse)
+def get_record_totals(
+    by: List[SummaryKey] = Query(["month"]),
+    currency: Optional[str] = None,
+    filters: RecordFilterSchema = Depends(),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(db.get_db),
+):
+    """기록을 by에 지정한 기준(자산, 분류, 월, 그룹)과 통화별로 묶어 수입, 지출, 합계를 반환합니다.
+
+    예) /summary/totals?by=month 는 월별 수입/지출, /summary/totals?by=category&by=month 는 월별 분류별 합계
+
+    currency를 지정하면 기록 날짜의 환율로 환산해 하나의 통화로 합산합니다.
+    """
+    if currency is not None:
+        rates = get_target_rates(db, currency)
+        return FastJSONResponse(generate_standard_response(query_converted_totals(db, user_id, by, filters, rates, currency)))
+
+    if "category" not in by and not filters.model_dump(exclude_none=True):
+        rows = query_monthly_totals(db, user_id, by)
+        return FastJSONResponse(generate_standard_response(summary_rows_to_dicts(rows)))
+
+    rows = query_record_totals(db, user_id, by, filters)
+    return FastJSONResponse(generate_standard_response(summary_rows_to_dicts(rows)))
@@ -0,0 +1,137 @@
+import base64
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import select
+
+from app.config import settings
+from app.database.database import utc_now
+from app.responses import FastJSONResponse
+from app.serializers import get_serializer
+from app.utils import generate_standard_response, parse_datetime
+
+from ..auth import get_current_user_id
+from ..database import Asset, AssetRecord, DeletedRow, UserGroup, UserGroupRelation, db
+from .records import RecordFilterSchema, filter_records
+
+router = APIRouter()
+
+
+def parse_since(since: str) -> datetime:
+    try:
+        return parse_datetime(int(since) if since.isdigit() else since).replace(tzinfo=None)
+    except (ValueError, OverflowError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def encode_sync_cursor(started_at: datetime, updated_at: datetime, id: int) -> str:
+    """첫 페이지를 조회한 시각과 마지막 기록의 (updated_at, id)를 커서 문자열로 변환합니다."""
+    raw = f"{started_at.isoformat()}|{updated_at.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_sync_cursor(cursor: str) -> Tuple[datetime, datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        started_at, updated_at, id = raw.split("|")
+        return datetime.fromisoformat(started_at), datetime.fromisoformat(updated_at), int(id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail=f"Invalid cursor '{cursor}'")
+
+
+def query_deleted_ids(db: Session, user_id: int, user_groups, since: datetime) -> Dict[str, List[int]]:
+    rows = (
+        db.query(DeletedRow.table_name, DeletedRow.row_id)
+        .filter(
+            or_(DeletedRow.group_id.in_(user_groups), DeletedRow.user_id == user_id),
+            DeletedRow.deleted_at >= since,
+        )
+        .order_by(DeletedRow.id)
+        .all()
+    )
+    deleted: Dict[str, List[int]] = defaultdict(list)
+    for row in rows:
+        deleted[row.table_name].append(row.row_id)
+    return deleted
+
+
+@router.get("/sync", tags=["sync"], response_class=FastJSONResponse)
+def get_changes(
+    since: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(db.get_db),
+):
+    """since 이후 추가, 변경된 기록, 자산, 그룹과 삭제된 행의 id를 반환합니다. since가 없으면 전체를 반환합니다.
+
+    기록은 (updated_at, id) 순서로 limit개씩 나누어 반환합니다. has_more가 참이면 since와 limit은 그대로 두고
+    next_cursor를 cursor로 전달해 다음 페이지를 받습니다. 자산, 그룹, 삭제된 행은 첫 페이지에만 들어 있습니다.
+    마지막 페이지(has_more가 거짓)의 next_since를 다음 동기화의 since로 사용하며, 페이지를 받는 동안의 변경을 놓치지 않도록
+    첫 페이지를 조회한 시각을 기준으로 합니다. next_since는 커밋이 늦게 끝난 변경을 놓치지 않도록 조금 앞당긴 시각이므로
+    같은 변경이 두 번 전달될 수 있으며, 클라이언트는 id 기준으로 덮어써야 합니다.
+    since가 삭제 기록 보관 기간보다 오래되었으면 410을 반환하며, 이때는 since 없이 다시 요청합니다.
+    삭제된 자산의 기록과 삭제된 그룹의 자산은 따로 전달되지 않으므로 클라이언트에서 함께 지웁니다.
+    """
+    if cursor is not None:
+        started_at, cursor_updated_at, cursor_id = decode_sync_cursor(cursor)
+    else:
+        started_at = utc_now()
+    since_time = parse_since(since) if since is not None else None
+    if since_time is not None and since_time < started_at - timedelta(days=settings.sync_tombstone_days):
+        raise HTTPException(status_code=410, detail="since is older than the sync history; request a full sync")
+
+    user_groups = select(UserGroupRelation.group_id).filter(UserGroupRelation.user_id == user_id).scalar_subquery()
+    records = filter_records(
+        db.query(*get_serializer(AssetRecord).select_columns), user_id, RecordFilterSchema(), use_asset_index=False
+    )
+    assets = db.query(*get_serializer(Asset).select_columns).filter(Asset.owner_group_id.in_(user_groups))
+    groups = (
+        db.query(*get_serializer(UserGroup).select_columns)
+        .join(UserGroupRelation, UserGroupRelation.group_id == UserGroup.id)
+        .filter(UserGroupRelation.user_id == user_id)
+    )
+
+    deleted: Dict[str, List[int]] = {}
+    if since_time is not None:
+        records = records.filter(AssetRecord.updated_at >= since_time)
+        assets = assets.filter(Asset.updated_at >= since_time)
+        groups = groups.filter(UserGroup.updated_at >= since_time)
+        if cursor is None:
+            deleted = query_deleted_ids(db, user_id, user_groups, since_time)
+    if cursor is not None:
+        records = records.filter(
+            or_(
+                AssetRecord.updated_at > cursor_updated_at,
+                and_(AssetRecord.updated_at == cursor_updated_at, AssetRecord.id > cursor_id),
+            )
+        )
+
+    # 다음 페이지 존재 여부 확인을 위해 limit + 1개를 조회
+    record_rows = records.order_by(AssetRecord.updated_at, AssetRecord.id).limit(limit + 1).all()
+    has_more = len(record_rows) > limit
+    next_cursor = None
+    if has_more:
+        record_rows = record_rows[:limit]
+        next_cursor = encode_sync_cursor(started_at, record_rows[-1].updated_at, record_rows[-1].id)
+
+    result = {
+        "since": since,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+        "next_since": None if has_more else (started_at - timedelta(seconds=settings.sync_overlap_seconds)).isoformat() + "Z",
+    }
+    for name, model, rows in (
+        ("records", AssetRecord, record_rows),
+        ("assets", Asset, assets.order_by(Asset.updated_at, Asset.id).all() if cursor is None else []),
+        ("groups", UserGroup, groups.order_by(UserGroup.updated_at, UserGroup.id).all() if cursor is None else []),
+    ):
+        changes = generate_standard_response(rows, model)
+        changes["deleted"] = deleted.get(model.__tablename__, [])
+        result[name] = changes
+
+    return FastJSONResponse(result)
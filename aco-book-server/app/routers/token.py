@@ -1,34 +1,49 @@
 import json
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Cookie, Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from ..database import User, db
-from ..auth import hash_password, generate_token, verify_token
+from ..auth import generate_token, get_current_user_id, hash_password_async, verify_password_async
 from .users import UserRequest
 import urllib.parse
 
 router = APIRouter()
 
 @router.get("/token/")
-async def check_token(token: str = Cookie(None)):
-    verify_token(token)
+async def check_token(_: int = Depends(get_current_user_id)):
     return {"state": "valid"}
 
 
+def find_login_user(db: Session, username: str):
+    return (
+        db.query(User.id, User.password, User.nickname)
+        .filter(User.username == username)
+        .first()
+    )
+
+
+def update_password_hash(db: Session, user_id: int, password_hash: str) -> None:
+    db.query(User).filter(User.id == user_id).update({User.password: password_hash}, synchronize_session=False)
+    db.commit()
+
+
 @router.post("/token/")
 async def get_login_token(
     res: Response, auth_data: UserRequest, db: Session = Depends(db.get_db)
 ):
-    result = (
-        db.query(User.id, User.password, User.nickname)
-        .filter(User.username == auth_data.username)
-        .first()
-    )
+    # DB 조회는 스레드풀에서, 비밀번호 확인은 해시 전용 스레드에서 실행해 이벤트 루프를 막지 않음
+    result = await run_in_threadpool(find_login_user, db, auth_data.username)
     if not result:
         raise HTTPException(status_code=401, detail="Incorrect username")
-    if result[1] != hash_password(auth_data.password):
+    matched, needs_rehash = await verify_password_async(auth_data.password, result[1])
+    if not matched:
         raise HTTPException(status_code=401, detail="Incorrect password")
+    if needs_rehash:
+        # 예전 방식이나 비용으로 저장된 해시는 현재 설정으로 다시 저장
+        password_hash = await hash_password_async(auth_data.password)
+        await run_in_threadpool(update_password_hash, db, result[0], password_hash)
 
     token = generate_token(result[0])
     # res.set_cookie(key="token", value=token, httponly=True)
@@ -1,12 +1,13 @@
 from sqlite3 import IntegrityError
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from sqlalchemy.exc import IntegrityError
 
 from app.database import User, db, UserGroup, UserGroupRelation
-from app.auth import hash_password
+from app.auth import hash_password_async
 
 
 class UserRequest(BaseModel):
@@ -30,9 +31,14 @@ async def get_users_info():
 
 @router.post("/users/", tags=["users"])
 async def signup_user(user_data: UserSignUpRequest, db: Session = Depends(db.get_db)):
+    password_hash = await hash_password_async(user_data.password)
+    return await run_in_threadpool(create_user, db, user_data, password_hash)
+
+
+def create_user(db: Session, user_data: UserSignUpRequest, password_hash: str):
     new_user = User(
         username=user_data.username,
-        password=hash_password(user_data.password),
+        password=password_hash,
         email=user_data.email,
         full_name=user_data.name,
         nickname=user_data.nickname,
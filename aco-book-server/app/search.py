@@ -0,0 +1,161 @@
+"""asset_records.category 전문 검색입니다.
+
+SQLite에서는 FTS5 가상 테이블(asset_records_fts)을 사용합니다. 색인은 asset_records의 트리거로 갱신되므로
+executemany로 여러 행을 넣는 대량 추가/가져오기와 삭제도 같은 트랜잭션 안에서 반영됩니다.
+색인이 어긋났다고 의심되면 aco-book-server 디렉터리에서 다시 만듭니다.
+
+    python -m app.search rebuild
+
+FTS5를 사용할 수 없는 DB(PostgreSQL, FTS5 없이 빌드된 SQLite)에서는 단어 접두어 LIKE 검색으로 대신합니다.
+"""
+import base64
+import logging
+import re
+import sys
+from typing import List, Tuple
+
+from sqlalchemy import and_, literal_column, or_, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement, Subquery
+
+from app.database import AssetRecord
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "asset_records_fts"
+
+_FTS_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        category, content='asset_records', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON asset_records BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, category) VALUES (new.id, new.category);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON asset_records BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, category) VALUES ('delete', old.id, old.category);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF category ON asset_records BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, category) VALUES ('delete', old.id, old.category);
+        INSERT INTO {FTS_TABLE}(rowid, category) VALUES (new.id, new.category);
+    END""",
+]
+
+# 엔진별 FTS5 색인 존재 여부
+_available = {}
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def create_search_index(connection: Connection) -> bool:
+    """SQLite이면 검색 색인과 트리거를 만들고, 새로 만든 경우 기존 기록으로 색인을 채웁니다. 색인을 사용할 수 있으면 참을 반환합니다.
+
+    마이그레이션의 트랜잭션 안에서 호출되며, FTS5를 만들 수 없으면 그 부분만 되돌립니다.
+    """
+    engine = connection.engine
+    if engine.dialect.name != "sqlite":
+        _available[engine] = False
+        return False
+
+    try:
+        with connection.begin_nested():
+            if not _index_exists(connection):
+                for statement in _FTS_SCHEMA:
+                    connection.exec_driver_sql(statement)
+                connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    except OperationalError as e:
+        logger.warning(f"Full-text search index is not available, falling back to LIKE search: {e}")
+        _available[engine] = False
+        return False
+
+    _available[engine] = True
+    return True
+
+
+def _index_exists(connection: Connection) -> bool:
+    return connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).first() is not None
+
+
+def has_search_index(db: Session) -> bool:
+    engine = db.get_bind()
+    available = _available.get(engine)
+    if available is None:
+        available = engine.dialect.name == "sqlite" and _index_exists(db.connection())
+        _available[engine] = available
+    return available
+
+
+def rebuild(db: Session) -> None:
+    db.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    db.commit()
+
+
+def parse_search_terms(query: str) -> List[str]:
+    """검색어를 단어 목록으로 나눕니다. 따옴표나 FTS5 연산자 같은 기호는 무시합니다."""
+    return _TOKEN_PATTERN.findall(query)
+
+
+def match_subquery(terms: List[str]) -> Subquery:
+    """모든 단어로 시작하는 단어를 가진 기록의 (id, rank)를 조회하는 서브쿼리입니다. rank는 작을수록 관련도가 높습니다."""
+    expression = " ".join(f'"{term}"*' for term in terms)
+    return (
+        select(literal_column("rowid").label("id"), literal_column("rank").label("rank"))
+        .select_from(text(FTS_TABLE))
+        .where(text(f"{FTS_TABLE} MATCH :expression").bindparams(expression=expression))
+        .subquery("matches")
+    )
+
+
+def like_condition(terms: List[str]) -> ColumnElement:
+    """FTS5가 없을 때 사용할 단어 접두어 조건입니다."""
+    conditions = []
+    for term in terms:
+        escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        conditions.append(
+            or_(
+                AssetRecord.category.ilike(f"{escaped}%", escape="\\"),
+                AssetRecord.category.ilike(f"% {escaped}%", escape="\\"),
+            )
+        )
+    return and_(*conditions)
+
+
+def encode_rank_cursor(rank: float, id: int) -> str:
+    """관련도 순 페이지네이션의 마지막 행 (rank, id)를 커서 문자열로 변환합니다."""
+    return base64.urlsafe_b64encode(f"{rank!r}|{id}".encode()).decode()
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        rank, id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return float(rank), int(id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def main(argv: List[str]) -> int:
+    from app.database import db as database
+
+    if argv != ["rebuild"]:
+        print("usage: python -m app.search rebuild")
+        return 2
+
+    database.create_tables()
+    session = database.SessionLocal()
+    try:
+        # python -m으로 실행하면 이 모듈은 __main__으로 따로 로드되므로 모듈 변수 대신 DB에서 확인
+        if not has_search_index(session):
+            print("Full-text search index is not available for this database")
+            return 1
+        rebuild(session)
+        print(f"Rebuilt {FTS_TABLE}")
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,111 @@
+from datetime import datetime
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Type
+
+from sqlalchemy import Column
+from sqlalchemy.orm import DeclarativeMeta
+from sqlalchemy.sql.sqltypes import DateTime, Enum
+
+
+class ModelSerializer:
+    """매핑된 클래스 하나에 대한 직렬화 정보를 한 번만 계산해 보관합니다.
+
+    매 요청마다 __table__.columns를 순회하고 값마다 isinstance로 타입을 확인하는 대신,
+    컬럼 타입에 맞춰 생성한 row_to_dict 함수와 columns, dtypes 메타데이터를 재사용합니다.
+    """
+
+    def __init__(self, model: Type[DeclarativeMeta]) -> None:
+        self.model = model
+        self.select_columns: List[Column] = list(model.__table__.columns)
+        self.columns: List[str] = [col.name for col in self.select_columns]
+        self.foreign_key_columns: List[Column] = [col for col in self.select_columns if col.foreign_keys]
+
+        # 외부키 컬럼의 dtype은 요청마다 달라지므로 generate_standard_response에서 채움
+        self.dtypes: Dict[str, Any] = {}
+        for col in self.select_columns:
+            if type(col.type) == Enum:
+                self.dtypes[col.name] = col.type.enums
+            else:
+                self.dtypes[col.name] = str(col.type)
+
+        self.row_to_dict: Callable[[Sequence[Any]], Dict[str, Any]] = _compile_row_to_dict(self.select_columns)
+        # app.responses.dumps로 인코딩할 응답용. datetime을 문자열로 바꾸지 않고 인코더에 맡김
+        self.row_to_native_dict: Callable[[Sequence[Any]], Dict[str, Any]] = _compile_row_to_dict(self.select_columns, native=True)
+        # rows_to_columns에서 열마다 적용할 변환 함수. 변환이 필요 없는 열은 None
+        self.column_converters: List[Optional[Callable[[Any], Any]]] = []
+        self.native_column_converters: List[Optional[Callable[[Any], Any]]] = []
+        for col in self.select_columns:
+            if isinstance(col.type, Enum) and col.type.enum_class is not None:
+                self.column_converters.append(attrgetter("name"))
+                self.native_column_converters.append(attrgetter("name"))
+            elif isinstance(col.type, DateTime):
+                self.column_converters.append(datetime.isoformat)
+                self.native_column_converters.append(None)
+            else:
+                self.column_converters.append(None)
+                self.native_column_converters.append(None)
+
+        getter = attrgetter(*self.columns)
+        if len(self.columns) == 1:
+            self.entity_to_row: Callable[[Any], Sequence[Any]] = lambda entity: (getter(entity),)
+        else:
+            self.entity_to_row = getter
+
+    def rows_to_dicts(self, rows: Iterable[Sequence[Any]], native: bool = False) -> List[Dict[str, Any]]:
+        """select_columns 순서로 조회한 컬럼 튜플을 응답용 dict 목록으로 변환합니다.
+
+        native가 참이면 datetime 값을 그대로 두며, 결과는 app.responses.dumps로 인코딩해야 합니다.
+        """
+        row_to_dict = self.row_to_native_dict if native else self.row_to_dict
+        return [row_to_dict(row) for row in rows]
+
+    def rows_to_columns(self, rows: Iterable[Sequence[Any]], native: bool = False) -> Dict[str, List[Any]]:
+        """select_columns 순서로 조회한 컬럼 튜플을 열 이름마다 값 목록을 가진 dict로 변환합니다.
+
+        행마다 열 이름을 반복하지 않으므로 큰 목록의 응답 크기와 클라이언트 파싱 시간이 줄어듭니다. native는 rows_to_dicts와 같습니다.
+        """
+        rows = list(rows)
+        values = zip(*rows) if rows else ([] for _ in self.columns)
+        converters = self.native_column_converters if native else self.column_converters
+        result = {}
+        for name, column_values, convert in zip(self.columns, values, converters):
+            if convert is None:
+                result[name] = list(column_values)
+            else:
+                result[name] = [None if value is None else convert(value) for value in column_values]
+        return result
+
+    def entities_to_dicts(self, entities: Iterable[Any], native: bool = False) -> List[Dict[str, Any]]:
+        """ORM 엔티티 목록을 응답용 dict 목록으로 변환합니다. native는 rows_to_dicts와 같습니다."""
+        row_to_dict = self.row_to_native_dict if native else self.row_to_dict
+        entity_to_row = self.entity_to_row
+        return [row_to_dict(entity_to_row(entity)) for entity in entities]
+
+
+def _compile_row_to_dict(columns: List[Column], native: bool = False) -> Callable[[Sequence[Any]], Dict[str, Any]]:
+    # 컬럼 타입에 따라 변환식을 미리 정해 dict 리터럴 하나를 반환하는 함수를 생성
+    items = []
+    for index, col in enumerate(columns):
+        value = f"row[{index}]"
+        if isinstance(col.type, Enum) and col.type.enum_class is not None:
+            value = f"(None if {value} is None else {value}.name)"
+        elif isinstance(col.type, DateTime) and not native:
+            value = f"(None if {value} is None else {value}.isoformat())"
+        items.append(f"{col.name!r}: {value}")
+
+    source = "def row_to_dict(row):\n    return {" + ", ".join(items) + "}\n"
+    namespace: Dict[str, Any] = {}
+    exec(source, namespace)
+    return namespace["row_to_dict"]
+
+
+_serializers: Dict[Type[DeclarativeMeta], ModelSerializer] = {}
+
+
+def get_serializer(model: Type[DeclarativeMeta]) -> ModelSerializer:
+    """모델의 ModelSerializer를 반환합니다. 처음 요청될 때 한 번만 생성됩니다."""
+    serializer = _serializers.get(model)
+    if serializer is None:
+        serializer = ModelSerializer(model)
+        _serializers[model] = serializer
+    return serializer
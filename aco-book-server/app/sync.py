@@ -0,0 +1,73 @@
+"""/sync API를 위한 삭제 기록(deleted_rows)을 관리합니다.
+
+자산, 기록, 그룹을 삭제하는 API는 같은 트랜잭션 안에서 add_tombstones 또는 add_user_tombstones를 호출해야 합니다.
+settings.sync_tombstone_days보다 오래된 삭제 기록은 aco-book-server 디렉터리에서 다음 명령으로 지웁니다.
+
+    python -m app.sync prune
+"""
+import sys
+from datetime import timedelta
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import DeletedRow
+from app.database.database import utc_now
+
+
+def add_tombstones(db: Session, table_name: str, rows: Iterable[Tuple[int, int]]) -> None:
+    """삭제된 행을 소유 그룹 기준으로 기록합니다. 커밋은 호출한 쪽에서 수행합니다.
+
+    Args:
+        db (Session): 행을 삭제하는 것과 같은 세션
+        table_name (str): 삭제된 행의 테이블 이름
+        rows (Iterable[Tuple[int, int]]): (행 id, 소유 그룹 id) 목록
+    """
+    deleted_at = utc_now()
+    values = [{"table_name": table_name, "row_id": row_id, "group_id": group_id, "deleted_at": deleted_at} for row_id, group_id in rows]
+    if values:
+        db.execute(insert(DeletedRow), values)
+
+
+def add_user_tombstones(db: Session, table_name: str, rows: Iterable[Tuple[int, int]]) -> None:
+    """삭제된 행을 사용자 기준으로 기록합니다. 그룹처럼 삭제 후에는 소유 그룹으로 구성원을 찾을 수 없는 경우에 사용합니다.
+
+    Args:
+        db (Session): 행을 삭제하는 것과 같은 세션
+        table_name (str): 삭제된 행의 테이블 이름
+        rows (Iterable[Tuple[int, int]]): (행 id, 사용자 id) 목록
+    """
+    deleted_at = utc_now()
+    values = [{"table_name": table_name, "row_id": row_id, "user_id": user_id, "deleted_at": deleted_at} for row_id, user_id in rows]
+    if values:
+        db.execute(insert(DeletedRow), values)
+
+
+def prune(db: Session) -> int:
+    """보관 기간이 지난 삭제 기록을 지우고 지운 행 수를 반환합니다."""
+    before = utc_now() - timedelta(days=settings.sync_tombstone_days)
+    count = db.query(DeletedRow).filter(DeletedRow.deleted_at < before).delete(synchronize_session=False)
+    db.commit()
+    return count
+
+
+def main(argv: List[str]) -> int:
+    from app.database import db as database
+
+    if argv != ["prune"]:
+        print("usage: python -m app.sync prune")
+        return 2
+
+    database.create_tables()
+    session = database.SessionLocal()
+    try:
+        print(f"Removed {prune(session)} tombstones")
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
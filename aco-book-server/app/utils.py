@@ -1,117 +1,312 @@
-from typing import Any, Dict, List, Optional, Set, Union
+import base64
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, Sequence, Set, Tuple, Union
+from fastapi import HTTPException
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import Date, cast, func
 from sqlalchemy.orm import DeclarativeMeta, Session
-from sqlalchemy.sql.sqltypes import Enum
+from sqlalchemy.sql import ColumnElement, Select, select
 from sqlalchemy.sql.schema import ForeignKey
-import enum
 from datetime import datetime, timezone
 
+from app import metrics
+from app.cache import TTLCache
+from app.exporters import EXPORT_FORMATS, is_format_available, rows_to_arrow_ipc
+from app.responses import dumps
+from app.database import Asset, User, UserGroup, UserGroupRelation
+from app.serializers import get_serializer
+
 def generate_standard_response(
     data: Union[List[DeclarativeMeta], List[Dict[Any, Any]]],
     db_type: Optional[DeclarativeMeta] = None,
     db: Optional[Session] = None,
+    user_id: Optional[int] = None,
+    columnar: bool = False,
 ):
     """모든 API 응답에 사용되는 표준 응답을 생성합니다. 현재는 변환된 데이터도 받지만 차후에는 쿼리 결과만 받도록 수정할 예정입니다.
 
     Args:
-        data (Union[List[DeclarativeMeta], List[Dict[Any, Any]]]): 쿼리 완료된 데이터
+        data (Union[List[DeclarativeMeta], List[Dict[Any, Any]]]): 쿼리 완료된 데이터. ORM 엔티티 또는 get_serializer(db_type).select_columns로 조회한 컬럼 튜플
         db_type (Optional[DeclarativeMeta], optional): 응답 결과에 속성과 타입을 명시할 때 제공. Defaults to None.
         db (Optional[Session], optional): 응답 결과에 외부키 관계를 명시할 때 제공. Defaults to None.
+        user_id (Optional[int], optional): 외부키 관계를 이 사용자가 볼 수 있는 행으로 제한할 때 제공. Defaults to None.
+        columnar (bool, optional): 참이면 data를 행 목록 대신 {열 이름: 값 목록} 형태로 반환. db_type이 필요합니다. Defaults to False.
 
     Returns:
-        _type_: _description_
+        Dict[str, Any]: data, columns, dtypes를 가진 응답. datetime 값이 그대로 들어 있으므로 FastJSONResponse로 반환합니다.
     """
-    if len(data) > 0 and isinstance(data[0], dict) == False:
-        data = convert_general_format(data)
+    metrics.add_rows(len(data))
+    with metrics.measure("serialize"):
+        if columnar and db_type is not None:
+            if len(data) > 0 and isinstance(data[0], db_type):
+                data = convert_dict_format(data)
+            else:
+                data = get_serializer(db_type).rows_to_columns(data, native=True)
+        elif len(data) > 0 and isinstance(data[0], dict) == False:
+            if db_type is not None and not isinstance(data[0], db_type):
+                # get_serializer(db_type).select_columns로 조회한 컬럼 튜플
+                data = get_serializer(db_type).rows_to_dicts(data, native=True)
+            else:
+                data = convert_general_format(data)
 
     response_body = {
         "data": data,
     }
 
     if db_type is not None:
-        coloumns = db_type.__table__.columns.keys()
-        response_body["columns"] = coloumns
+        serializer = get_serializer(db_type)
+        response_body["columns"] = serializer.columns
 
-        dtypes = {col.name: str(col.type) for col in db_type.__table__.columns}
+        dtypes = dict(serializer.dtypes)
         response_body["dtypes"] = dtypes
-        for col in db_type.__table__.columns:
-            if type(col.type) == Enum:
-                dtypes[col.name] = col.type.enums
-            elif db is not None and col.foreign_keys:
-                dtypes[col.name] = get_foreign_sublist(db, col.foreign_keys)[0]
+        if db is not None:
+            for col in serializer.foreign_key_columns:
+                dtypes[col.name] = get_foreign_sublist(db, col.foreign_keys, user_id)[0]
                 # 일단 이중 Foreign Key는 고려하지 않음
-            else:
-                dtypes[col.name] = str(col.type)
 
     return response_body
 
-def get_foreign_sublist(db: Session, foreign_keys: Set[ForeignKey]) -> List[Union[Dict[str, int], List[int]]]:
+# 목록 API의 응답 형식. rows는 행 목록, columnar는 열별 값 목록, arrow는 Apache Arrow IPC 스트림
+ListFormat = Literal["rows", "columnar", "arrow"]
+
+
+def check_list_format(format: ListFormat, stream: Optional[str] = None) -> None:
+    """목록 API의 format 값을 쿼리 전에 확인합니다."""
+    if format != "rows" and stream is not None:
+        raise HTTPException(status_code=400, detail="format cannot be combined with stream")
+    if format == "arrow" and not is_format_available(EXPORT_FORMATS["arrow"]):
+        raise HTTPException(status_code=400, detail="format 'arrow' requires pyarrow to be installed")
+
+
+def generate_arrow_response(rows: Sequence[Sequence[Any]], db_type: DeclarativeMeta, headers: Optional[Dict[str, str]] = None) -> Response:
+    """get_serializer(db_type).select_columns로 조회한 컬럼 튜플을 Arrow IPC 스트림 응답으로 반환합니다."""
+    metrics.add_rows(len(rows))
+    with metrics.measure("serialize"):
+        body = rows_to_arrow_ipc(rows, db_type)
+    return Response(body, media_type=EXPORT_FORMATS["arrow"].media_type, headers=headers)
+
+
+def iter_serialized_batches(
+    statement: Select, db_type: DeclarativeMeta, db: Session, batch_size: int = 1000
+) -> Iterator[List[Dict[str, Any]]]:
+    """쿼리 결과를 batch_size 행씩 읽어 응답용 dict 목록으로 변환합니다.
+
+    요청 세션은 응답 전송 전에 닫힐 수 있으므로 같은 엔진에 별도 세션을 열어 서버 측 커서로 읽습니다.
+    """
+    serializer = get_serializer(db_type)
+    session = Session(bind=db.get_bind())
+    try:
+        result = session.execute(statement.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            metrics.add_rows(len(partition))
+            with metrics.measure("serialize"):
+                rows = serializer.rows_to_dicts(partition)
+            yield rows
+    finally:
+        session.close()
+
+
+def generate_streaming_response(
+    statement: Select,
+    db_type: DeclarativeMeta,
+    db: Session,
+    stream: str,
+    user_id: Optional[int] = None,
+    batch_size: int = 1000,
+) -> StreamingResponse:
+    """쿼리 결과를 한 번에 메모리에 올리지 않고 batch_size 단위로 읽어 전송하는 스트리밍 응답을 생성합니다.
+
+    Args:
+        statement (Select): get_serializer(db_type).select_columns를 조회하는 쿼리
+        db_type (DeclarativeMeta): 조회 대상 모델
+        db (Session): 요청 세션. columns, dtypes 생성과 엔진 확인에 사용합니다.
+        stream (str): "ndjson"이면 한 줄에 한 행, "json"이면 표준 응답 형식의 JSON을 나누어 전송
+        user_id (Optional[int], optional): dtypes의 외부키 관계를 제한할 사용자. Defaults to None.
+        batch_size (int, optional): 한 번에 읽어올 행 수. Defaults to 1000.
+
+    Returns:
+        StreamingResponse: 스트리밍 응답
+    """
+    def generate_ndjson() -> Iterator[bytes]:
+        for rows in iter_serialized_batches(statement, db_type, db, batch_size):
+            yield b"".join(dumps(row) + b"\n" for row in rows)
+
+    def generate_json(header: Dict[str, Any]) -> Iterator[bytes]:
+        yield dumps(header)[:-1] + b', "data": ['
+        first = True
+        for rows in iter_serialized_batches(statement, db_type, db, batch_size):
+            if not rows:
+                continue
+            yield (b"" if first else b", ") + b", ".join(dumps(row) for row in rows)
+            first = False
+        yield b"]}"
+
+    if stream == "ndjson":
+        return StreamingResponse(generate_ndjson(), media_type="application/x-ndjson")
+
+    # columns, dtypes는 요청 세션이 유효할 때 미리 생성
+    header = generate_standard_response([], db_type=db_type, db=db, user_id=user_id)
+    del header["data"]
+    return StreamingResponse(generate_json(header), media_type="application/json")
+
+def _member_groups(user_id: int):
+    return select(UserGroupRelation.group_id).filter(UserGroupRelation.user_id == user_id).scalar_subquery()
+
+
+# 외부키가 참조하는 테이블별로 사용자가 볼 수 있는 행의 조건
+_foreign_scopes: Dict[str, Callable[[int], ColumnElement]] = {
+    UserGroup.__tablename__: lambda user_id: UserGroup.id.in_(_member_groups(user_id)),
+    Asset.__tablename__: lambda user_id: Asset.owner_group_id.in_(_member_groups(user_id)),
+    User.__tablename__: lambda user_id: User.id.in_(
+        select(UserGroupRelation.user_id).filter(UserGroupRelation.group_id.in_(_member_groups(user_id))).scalar_subquery()
+    ),
+}
+
+# 참조 테이블별로 get_foreign_sublist 캐시가 유효한지 확인할 app.versions 자원. 이 테이블의 행을 추가, 삭제하는 API는
+# 같은 트랜잭션에서 해당 자원의 그룹 버전을 증가시키므로 어느 워커에서 변경했든 다음 조회에서 캐시를 버림
+_foreign_versions: Dict[str, str] = {
+    UserGroup.__tablename__: "groups",
+    Asset.__tablename__: "assets",
+    User.__tablename__: "groups",
+}
+
+foreign_sublist_cache = TTLCache(maxsize=4096, ttl=60.0)
+
+
+def get_foreign_sublist(
+    db: Session, foreign_keys: Set[ForeignKey], user_id: Optional[int] = None
+) -> List[Union[Dict[str, int], List[int]]]:
+    """외부키가 참조하는 테이블의 {name: id} 또는 [id] 목록을 반환합니다.
+
+    user_id가 주어지면 해당 사용자가 볼 수 있는 행만 조회하며, 결과는 (테이블, user_id) 단위로 캐시됩니다.
+    캐시한 결과는 사용자의 그룹 버전(app.versions.get_version)이 같을 때만 다시 사용합니다.
+    """
+    from app.versions import get_version
+
     sublist = []
     for foreign_key in foreign_keys:
         ref_table = foreign_key.column.table
-        ref_col_id = foreign_key.column.key
-        ref_col_name = 'name'
+        resource = _foreign_versions.get(ref_table.name)
+        if user_id is None or resource is None:
+            sublist.append(_query_foreign_sublist(db, foreign_key, user_id))
+            continue
 
-        if ref_col_name in ref_table.c:
-            ref_entities = db.query(ref_table.c[ref_col_id], ref_table.c[ref_col_name]).all()
-            ref_dict = {entity[1]: entity[0] for entity in ref_entities}
+        cache_key = (ref_table.name, user_id)
+        version = get_version(db, resource, user_id)
+        cached = foreign_sublist_cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            ref_dict = cached[1]
         else:
-            ref_entities = db.query(ref_table.c[ref_col_id]).all()
-            ref_dict = [entity[0] for entity in ref_entities]
-        
+            ref_dict = _query_foreign_sublist(db, foreign_key, user_id)
+            foreign_sublist_cache.set(cache_key, (version, ref_dict))
+
         sublist.append(ref_dict)
-    
+
     return sublist
 
+
+def _query_foreign_sublist(db: Session, foreign_key: ForeignKey, user_id: Optional[int]) -> Union[Dict[str, int], List[int]]:
+    ref_table = foreign_key.column.table
+    ref_col_id = foreign_key.column.key
+    ref_col_name = 'name'
+
+    if ref_col_name in ref_table.c:
+        query = db.query(ref_table.c[ref_col_id], ref_table.c[ref_col_name])
+    else:
+        query = db.query(ref_table.c[ref_col_id])
+
+    scope = _foreign_scopes.get(ref_table.name)
+    if user_id is not None and scope is not None:
+        query = query.filter(scope(user_id))
+
+    ref_entities = query.all()
+    if ref_col_name in ref_table.c:
+        return {entity[1]: entity[0] for entity in ref_entities}
+    return [entity[0] for entity in ref_entities]
+
+
+def month_of(db: Session, column: ColumnElement) -> ColumnElement:
+    """날짜 컬럼을 "YYYY-MM" 문자열로 변환하는 SQL 식을 반환합니다. DB마다 사용하는 함수가 다릅니다."""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m", column)
+    return func.to_char(column, "YYYY-MM")
+
+def day_of(db: Session, column: ColumnElement) -> ColumnElement:
+    """날짜 컬럼을 "YYYY-MM-DD" 날짜로 자르는 SQL 식을 반환합니다."""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(column)
+    return cast(column, Date)
+
 # --------------------------------------------------
 
 def convert_general_format(data: List[DeclarativeMeta]):
-    result = []
-    for element in data:
-        row = {}
-        for col in element.__table__.columns:
-            value = getattr(element, col.name)
-            if isinstance(value, enum.Enum):
-                row[col.name] = value.name
-                continue
+    if len(data) == 0:
+        return []
+    return get_serializer(type(data[0])).entities_to_dicts(data, native=True)
 
-            if isinstance(value, datetime):
-                row[col.name] = value.isoformat()
-                continue
 
-            row[col.name] = value
-        result.append(row)
-    return result
 
+def convert_dict_format(data: List[DeclarativeMeta]):
+    if len(data) == 0:
+        return {}
+    serializer = get_serializer(type(data[0]))
+    return serializer.rows_to_columns(map(serializer.entity_to_row, data), native=True)
 
+def encode_cursor(date: datetime, id: int) -> str:
+    """키셋 페이지네이션의 마지막 행 (date, id)를 URL에 사용할 수 있는 커서 문자열로 변환합니다."""
+    raw = f"{date.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
 
-def convert_dict_format(data: List[DeclarativeMeta]):
-    result = {col.name: [] for col in data[0].__table__.columns}
-    for element in data:
-        for col in element.__table__.columns:
-            result[col.name].append(getattr(element, col.name))
 
-    return result
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """encode_cursor로 생성된 커서를 (date, id)로 되돌립니다. 잘못된 커서는 ValueError를 발생시킵니다."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        date, id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(date), int(id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor '{cursor}'") from e
+
+
+# fromisoformat이 처리하지 못하는 형식(한 자리 월/일, 1~6자리 소수 초 등, Python 3.11 미만의 Z 접미사)을 위한 정규식
+_DATETIME_PATTERN = re.compile(
+    r"(\d{4})-(\d{1,2})-(\d{1,2})"
+    r"(?:[T ](\d{1,2}):(\d{1,2})(?::(\d{1,2})(?:\.(\d{1,6}))?)?)?Z?"
+)
+
 
 def parse_datetime(value: Union[int, str]):
+    """정수(UNIX 시간) 또는 날짜 문자열을 UTC datetime으로 변환합니다.
+
+    문자열은 YYYY-MM-DD 뒤에 T 또는 공백으로 구분한 HH:MM, HH:MM:SS, HH:MM:SS.ffffff를 붙인 형식이며 끝의 Z는 무시합니다.
+    시간대가 없으면 UTC로 간주하고, 시간대가 있으면 UTC로 변환합니다.
+    """
     if isinstance(value, int):
         return datetime.fromtimestamp(value, timezone.utc)
+    return _parse_datetime_string(value)
 
-    formats = [
-        "%Y-%m-%dT%H:%M:%S.%f",
-        "%Y-%m-%dT%H:%M:%S.%fZ",
-        "%Y-%m-%d %H:%M:%S.%f",
-        "%Y-%m-%dT%H:%M:%S",
-        "%Y-%m-%d %H:%M:%S",
-        "%Y-%m-%dT%H:%M",
-        "%Y-%m-%d %H:%M",
-        "%Y-%m-%d"
-    ]
-
-    for fmt in formats:
-        try:
-            result = datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
-            return result
-        except ValueError:
-            continue
-    
-    raise ValueError(f"Time data '{value}' does not match any of the formats.")
\ No newline at end of file
+
+@lru_cache(maxsize=4096)
+def _parse_datetime_string(value: str) -> datetime:
+    # 대량 입력에서는 같은 날짜가 반복되므로 결과를 기억해 둠(datetime은 불변이라 공유해도 안전)
+    try:
+        result = datetime.fromisoformat(value)
+    except ValueError:
+        match = _DATETIME_PATTERN.fullmatch(value)
+        if match is None:
+            raise ValueError(f"Time data '{value}' does not match any of the formats.")
+        year, month, day, hour, minute, second, fraction = match.groups()
+        result = datetime(
+            int(year),
+            int(month),
+            int(day),
+            int(hour or 0),
+            int(minute or 0),
+            int(second or 0),
+            int((fraction or "0").ljust(6, "0")),
+        )
+
+    if result.tzinfo is None:
+        return result.replace(tzinfo=timezone.utc)
+    return result.astimezone(timezone.utc)
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""목록 API의 조건부 요청(ETag, If-None-Match)을 위한 사용자별 데이터 버전입니다.
+
+버전은 DB의 group_versions 테이블에 (그룹, 자원 이름)마다 변경 횟수로 저장되며, 해당 자원을 바꾸는 API가
+커밋 전에 같은 트랜잭션에서 bump_group_versions로 증가시킵니다. 사용자의 버전은 속한 그룹과 그 그룹들의 변경 횟수로
+정해지므로 어느 워커에서 변경했든 바로 반영되고, 데이터가 바뀌지 않으면 ETag도 바뀌지 않습니다.
+그룹 가입, 탈퇴, 삭제는 사용자가 속한 그룹 목록이 바뀌므로 따로 증가시키지 않아도 됩니다.
+"""
+import hashlib
+from typing import Dict, Iterable
+
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+from app.auth import get_current_user_id
+from app.balances import upsert_increments
+from app.database import GroupVersion, UserGroupRelation, db as database
+
+VERSIONED_RESOURCES = ("assets", "groups", "records")
+
+
+def get_version(db: Session, resource: str, user_id: int) -> str:
+    """사용자가 속한 그룹과 각 그룹의 resource 변경 횟수를 나타내는 문자열입니다."""
+    rows = (
+        db.query(UserGroupRelation.group_id, UserGroupRelation.approved, GroupVersion.version)
+        .outerjoin(GroupVersion, and_(GroupVersion.group_id == UserGroupRelation.group_id, GroupVersion.resource == resource))
+        .filter(UserGroupRelation.user_id == user_id)
+        .order_by(UserGroupRelation.group_id)
+        .all()
+    )
+    return ",".join(f"{row.group_id}:{int(bool(row.approved))}:{row.version or 0}" for row in rows)
+
+
+def bump_group_versions(db: Session, group_ids: Iterable[int], *resources: str) -> None:
+    """주어진 그룹의 자원 버전을 증가시킵니다. resources가 없으면 모든 자원을 증가시킵니다. 커밋은 호출한 쪽에서 수행합니다."""
+    group_ids = set(group_ids)
+    if not group_ids:
+        return
+    resources = resources or VERSIONED_RESOURCES
+    upsert_increments(
+        db,
+        GroupVersion,
+        ["group_id", "resource"],
+        [{"group_id": group_id, "resource": resource, "version": 1} for group_id in sorted(group_ids) for resource in resources],
+    )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match는 약한 비교를 사용하므로 W/ 접두어는 무시
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in if_none_match.split(","))
+
+
+class ConditionalGet:
+    """목록 API의 의존성으로 사용하며 응답에 붙일 ETag 헤더를 반환합니다.
+
+    요청의 If-None-Match가 현재 ETag와 같으면 목록 쿼리를 실행하기 전에 304 응답으로 끝냅니다.
+    ETag는 같은 자원이라도 쿼리 문자열(필터, 커서 등)마다 다릅니다.
+
+    Args:
+        resource (str): VERSIONED_RESOURCES 중 하나
+    """
+
+    def __init__(self, resource: str) -> None:
+        self.resource = resource
+
+    def __call__(
+        self, request: Request, user_id: int = Depends(get_current_user_id), db: Session = Depends(database.get_db)
+    ) -> Dict[str, str]:
+        version = get_version(db, self.resource, user_id)
+        digest = hashlib.blake2b(f"{self.resource}|{user_id}|{version}?{request.url.query}".encode(), digest_size=8).hexdigest()
+        headers = {
+            "ETag": f'W/"{digest}"',
+            "Cache-Control": "private, no-cache",
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+            raise HTTPException(status_code=304, headers=headers)
+        return headers
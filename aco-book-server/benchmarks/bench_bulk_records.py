@@ -0,0 +1,91 @@
+"""행마다 커밋하는 create_record 방식과 /records/bulk의 청크 단위 삽입 처리량(rows/s)을 비교합니다.
+
+aco-book-server 디렉터리에서 실행합니다.
+
+    python -m benchmarks.bench_bulk_records --rows 20000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.database import Asset, AssetRecord, Currency, User, UserGroup
+from app.database.database import AssetType, Base
+from app.routers.records import insert_record_rows
+
+
+def make_rows(asset_id: int, rows: int):
+    start = datetime(2020, 1, 1)
+    return [
+        {
+            "asset_id": asset_id,
+            "date": start + timedelta(minutes=i),
+            "category": "bench",
+            "payment_amount": float(i % 1000),
+            "currency": Currency.KRW,
+            "approved_amount": float(i % 1000),
+        }
+        for i in range(rows)
+    ]
+
+
+def prepare(path: str) -> int:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with Session(bind=engine) as session:
+        user = User(username="bench", password="", email="bench@example.com", full_name="bench", nickname="bench")
+        session.add(user)
+        session.flush()
+        group = UserGroup(name="bench", admin=user.id)
+        session.add(group)
+        session.flush()
+        asset = Asset(owner_group_id=group.id, name="bench", asset_type=AssetType.CASH, currency=Currency.KRW)
+        session.add(asset)
+        session.commit()
+        asset_id = asset.id
+    engine.dispose()
+    return asset_id
+
+
+def run(label: str, rows: int, func) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        asset_id = prepare(path)
+        engine = create_engine(f"sqlite:///{path}")
+        data = make_rows(asset_id, rows)
+        with Session(bind=engine) as session:
+            begin = time.perf_counter()
+            func(session, data)
+            elapsed = time.perf_counter() - begin
+        engine.dispose()
+    print(f"{label:<32} {elapsed:8.3f}s {rows / elapsed:12,.0f} rows/s")
+
+
+def insert_one_by_one(session: Session, data) -> None:
+    for values in data:
+        record = AssetRecord(**values)
+        session.add(record)
+        session.commit()
+        session.refresh(record)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    run("per-row commit", min(args.rows, 2000), insert_one_by_one)
+    for chunk_size in (100, 1000, 5000):
+        def bulk(session: Session, data, chunk_size=chunk_size) -> None:
+            insert_record_rows(session, data, chunk_size)
+            session.commit()
+
+        run(f"bulk, chunk_size={chunk_size}", args.rows, bulk)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""기록 목록 응답의 JSON 인코딩 시간과 압축 전후 크기를 비교합니다.
+
+변경 전(날짜를 미리 문자열로 바꾸고 표준 json으로 인코딩)과 현재(app.responses.dumps) 방식을 비교하고,
+인코딩된 본문을 gzip, Brotli로 압축했을 때의 크기와 시간을 출력합니다. aco-book-server 디렉터리에서 실행합니다.
+
+    python -m benchmarks.bench_json_encoding --rows 50000
+"""
+import argparse
+import gzip
+import json
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.compression import brotli
+from app.config import settings
+from app.database import AssetRecord
+from app.database.database import Base
+from app.responses import dumps, orjson
+from app.serializers import get_serializer
+
+from .bench_serializers import populate
+
+
+def measure(label: str, func):
+    begin = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - begin
+    print(f"{label:<36} {elapsed * 1000:9.1f} ms {len(result):>12,} bytes")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with Session(bind=engine) as session:
+        populate(session, args.rows)
+        serializer = get_serializer(AssetRecord)
+        rows = session.query(*serializer.select_columns).all()
+
+    def response_body(native: bool):
+        return {"data": serializer.rows_to_dicts(rows, native=native), "columns": serializer.columns, "dtypes": serializer.dtypes}
+
+    print(f"{args.rows} records, orjson {'installed' if orjson else 'missing'}, brotli {'installed' if brotli else 'missing'}")
+    print("-- encoding (serialization + JSON)")
+    measure(
+        "before: isoformat + json.dumps",
+        lambda: json.dumps(response_body(False), ensure_ascii=False, separators=(",", ":")).encode(),
+    )
+    body = measure("after: native datetime + dumps", lambda: dumps(response_body(True)))
+
+    print("-- compression of the encoded body")
+    measure(f"gzip level {settings.gzip_level}", lambda: gzip.compress(body, compresslevel=settings.gzip_level))
+    if brotli is not None:
+        measure(f"brotli quality {settings.brotli_quality}", lambda: brotli.compress(body, quality=settings.brotli_quality))
+
+
+if __name__ == "__main__":
+    main()
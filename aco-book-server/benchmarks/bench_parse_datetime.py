@@ -0,0 +1,77 @@
+"""변경 전 strptime 반복 방식과 현재 parse_datetime을 지원하는 모든 날짜 형식에 대해 비교합니다.
+
+aco-book-server 디렉터리에서 실행합니다.
+
+    python -m benchmarks.bench_parse_datetime --values 200000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.utils import _parse_datetime_string, parse_datetime
+
+FORMATS = [
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+]
+
+
+def legacy_parse_datetime(value):
+    # 변경 전 parse_datetime 구현
+    if isinstance(value, int):
+        return datetime.fromtimestamp(value, timezone.utc)
+
+    for fmt in FORMATS:
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+
+    raise ValueError(f"Time data '{value}' does not match any of the formats.")
+
+
+def make_values(fmt: str, count: int, distinct: int):
+    start = datetime(2024, 1, 1)
+    pool = [
+        (start + timedelta(seconds=random.randrange(365 * 24 * 3600), microseconds=random.randrange(1000000))).strftime(fmt)
+        for _ in range(distinct)
+    ]
+    return [random.choice(pool) for _ in range(count)]
+
+
+def measure(parse, values) -> float:
+    start = time.perf_counter()
+    for value in values:
+        parse(value)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--values", type=int, default=200000)
+    parser.add_argument("--distinct", type=int, default=1000, help="반복되는 날짜 문자열 수(메모 효과 측정)")
+    args = parser.parse_args()
+
+    print(f"{'format':<24} {'legacy':>10} {'no memo':>10} {'memo':>10}")
+    for fmt in FORMATS:
+        values = make_values(fmt, args.values, args.distinct)
+        for value in values[:100]:
+            assert parse_datetime(value) == legacy_parse_datetime(value), value
+
+        legacy = measure(legacy_parse_datetime, values)
+        # 메모 없이 fromisoformat/정규식만 사용하는 경우
+        no_memo = measure(_parse_datetime_string.__wrapped__, values)
+        _parse_datetime_string.cache_clear()
+        memo = measure(parse_datetime, values)
+        print(f"{fmt:<24} {legacy:9.3f}s {no_memo:9.3f}s {memo:9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""비밀번호 해시 비용 설정별 로그인(verify_password) 처리량을 측정합니다.
+
+aco-book-server 디렉터리에서 실행합니다. 결과를 보고 ACO_SCRYPT_N, ACO_PBKDF2_ITERATIONS 등을 정합니다.
+
+    python -m benchmarks.bench_password_hashing --logins 64 --workers 4
+"""
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.auth import hash_password, verify_password
+from app.config import settings
+
+COST_SETTINGS = [
+    ("legacy sha256", None, {}),
+    ("scrypt n=2^13", "scrypt", {"scrypt_n": 2**13}),
+    ("scrypt n=2^14", "scrypt", {"scrypt_n": 2**14}),
+    ("scrypt n=2^15", "scrypt", {"scrypt_n": 2**15}),
+    ("scrypt n=2^16", "scrypt", {"scrypt_n": 2**16}),
+    ("pbkdf2_sha256 i=200k", "pbkdf2_sha256", {"pbkdf2_iterations": 200000}),
+    ("pbkdf2_sha256 i=600k", "pbkdf2_sha256", {"pbkdf2_iterations": 600000}),
+]
+
+
+def measure(label: str, password_hash: str, logins: int, workers: int) -> None:
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        start = time.perf_counter()
+        results = list(executor.map(lambda _: verify_password("password", password_hash), range(logins)))
+        elapsed = time.perf_counter() - start
+    assert all(matched for matched, _ in results)
+    print(f"{label:<24} {elapsed / logins * workers * 1000:8.1f} ms/login {logins / elapsed:10.1f} logins/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"{args.logins} logins, {args.workers} workers")
+    for label, scheme, costs in COST_SETTINGS:
+        if scheme is None:
+            password_hash = hashlib.sha256(b"password").hexdigest()
+        else:
+            settings.password_scheme = scheme
+            for name, value in costs.items():
+                setattr(settings, name, value)
+            password_hash = hash_password("password")
+        measure(label, password_hash, args.logins, args.workers)
+
+
+if __name__ == "__main__":
+    main()
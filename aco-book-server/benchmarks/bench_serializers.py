@@ -0,0 +1,113 @@
+"""convert_general_format의 행 단위 리플렉션 방식과 app.serializers의 컴파일된 직렬화 함수를 비교합니다.
+
+aco-book-server 디렉터리에서 실행합니다.
+
+    python -m benchmarks.bench_serializers --rows 100000
+"""
+import argparse
+import enum
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.database import Asset, AssetRecord, Currency, User, UserGroup
+from app.database.database import AssetType, Base
+from app.serializers import get_serializer
+
+
+def legacy_convert_general_format(data):
+    # 변경 전 convert_general_format 구현
+    result = []
+    for element in data:
+        row = {}
+        for col in element.__table__.columns:
+            value = getattr(element, col.name)
+            if isinstance(value, enum.Enum):
+                row[col.name] = value.name
+                continue
+
+            if isinstance(value, datetime):
+                row[col.name] = value.isoformat()
+                continue
+
+            row[col.name] = value
+        result.append(row)
+    return result
+
+
+def populate(session: Session, rows: int) -> None:
+    user = User(username="bench", password="", email="bench@example.com", full_name="bench", nickname="bench")
+    session.add(user)
+    session.flush()
+    group = UserGroup(name="bench", admin=user.id)
+    session.add(group)
+    session.flush()
+    asset = Asset(owner_group_id=group.id, name="bench", asset_type=AssetType.CASH, currency=Currency.KRW)
+    session.add(asset)
+    session.flush()
+
+    start = datetime(2020, 1, 1)
+    session.execute(
+        AssetRecord.__table__.insert(),
+        [
+            {
+                "asset_id": asset.id,
+                "date": start + timedelta(minutes=i),
+                "category": random.choice(["food", "transport", "salary", "rent"]),
+                "payment_amount": random.uniform(-100000, 100000),
+                "currency": Currency.KRW,
+                "approved_amount": None,
+            }
+            for i in range(rows)
+        ],
+    )
+    session.commit()
+
+
+def measure(label: str, rows: int, func) -> None:
+    begin = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - begin
+    assert len(result) == rows
+    print(f"{label:<40} {elapsed:8.3f}s {rows / elapsed:12,.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with Session(bind=engine) as session:
+        populate(session, args.rows)
+
+        entities = session.query(AssetRecord).all()
+        tuples = session.query(*get_serializer(AssetRecord).select_columns).all()
+        serializer = get_serializer(AssetRecord)
+
+        print("-- serialization only")
+        measure("before: reflection per row", args.rows, lambda: legacy_convert_general_format(entities))
+        measure("after: compiled, ORM entities", args.rows, lambda: serializer.entities_to_dicts(entities))
+        measure("after: compiled, column tuples", args.rows, lambda: serializer.rows_to_dicts(tuples))
+
+        print("-- query + serialization")
+        session.expunge_all()
+        measure(
+            "before: ORM entities + reflection",
+            args.rows,
+            lambda: legacy_convert_general_format(session.query(AssetRecord).all()),
+        )
+        session.expunge_all()
+        measure(
+            "after: column tuples + compiled",
+            args.rows,
+            lambda: serializer.rows_to_dicts(session.query(*serializer.select_columns).all()),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""워커 하나의 시작 비용(import 시간, lifespan 시작 시간, 최대 RSS)과 import 시간이 큰 패키지를 보고합니다.
+
+매번 새 프로세스에서 측정하며, 첫 실행은 빈 DB에 마이그레이션을 적용하므로 이후 실행(버전 확인만 함)과 따로 보여 줍니다.
+aco-book-server 디렉터리에서 실행합니다.
+
+    python -m benchmarks.bench_startup --runs 5 --top 15
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+
+def measure_boot() -> Dict[str, Any]:
+    began = time.perf_counter()
+    from app import app
+
+    imported = time.perf_counter()
+
+    async def boot() -> None:
+        async with app.router.lifespan_context(app):
+            pass
+
+    asyncio.run(boot())
+    booted = time.perf_counter()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "import_ms": (imported - began) * 1000,
+        "startup_ms": (booted - imported) * 1000,
+        # Linux는 KB, macOS는 바이트 단위
+        "peak_rss_mb": peak / 2**20 if sys.platform == "darwin" else peak / 1024,
+        "modules": len(sys.modules),
+    }
+
+
+def run_child(env: Dict[str, str]) -> Dict[str, Any]:
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child"], env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_profile(env: Dict[str, str]) -> List[Tuple[str, float]]:
+    """python -X importtime 결과를 최상위 패키지별 자체 import 시간(ms)으로 합산합니다."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], env=env, capture_output=True, text=True, check=True)
+    totals: Dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us) / 1000
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def print_boot(label: str, results: List[Dict[str, Any]]) -> None:
+    values = {key: statistics.median(result[key] for result in results) for key in results[0]}
+    print(
+        f"{label:<16} import {values['import_ms']:8.1f} ms  startup {values['startup_ms']:8.1f} ms"
+        f"  peak RSS {values['peak_rss_mb']:7.1f} MB  modules {values['modules']:.0f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_boot()))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, ACO_SQLITE_PATH=os.path.join(directory, "startup.db"), ACO_MIGRATE_ON_STARTUP="1")
+        env.pop("ACO_DATABASE_URL", None)
+
+        print_boot("first boot", [run_child(env)])
+        print_boot("boot (median)", [run_child(env) for _ in range(args.runs)])
+
+        profile = import_profile(env)
+        print(f"\nimport time by package (total {sum(ms for _, ms in profile):.1f} ms)")
+        for package, ms in profile[:args.top]:
+            print(f"  {package:<24} {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
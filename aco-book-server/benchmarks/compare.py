@@ -0,0 +1,52 @@
+"""benchmarks.suite 결과 파일 두 개를 비교합니다. 처리량은 높을수록, 지연 시간과 RSS는 낮을수록 좋습니다.
+
+    python -m benchmarks.compare bench-abc1234.json bench-def5678.json
+"""
+import argparse
+import json
+from typing import Any, Dict, Optional
+
+
+def change(before: Optional[float], after: Optional[float]) -> str:
+    if not before or after is None:
+        return "-"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any]) -> None:
+    print(f"before {str(before.get('commit'))[:7]}  after {str(after.get('commit'))[:7]}")
+    for mode, after_mode in after["modes"].items():
+        before_mode = before["modes"].get(mode)
+        if before_mode is None:
+            continue
+        print(f"{mode}:")
+        print(f"  {'scenario':<24} {'req/s':>10} {'change':>8} {'p95 ms':>10} {'change':>8} {'p99 ms':>10} {'change':>8}")
+        for name, result in after_mode["scenarios"].items():
+            previous = before_mode["scenarios"].get(name)
+            if previous is None:
+                continue
+            print(
+                f"  {name:<24} {result['throughput_rps']:10,.1f} {change(previous['throughput_rps'], result['throughput_rps']):>8}"
+                f" {result['p95_ms']:10.1f} {change(previous['p95_ms'], result['p95_ms']):>8}"
+                f" {result['p99_ms']:10.1f} {change(previous['p99_ms'], result['p99_ms']):>8}"
+            )
+        rss_before, rss_after = before_mode.get("peak_rss_bytes"), after_mode.get("peak_rss_bytes")
+        if rss_after is not None:
+            print(f"  {'peak RSS':<24} {rss_after / 2**20:10,.1f} MB {change(rss_before, rss_after):>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before) as file:
+        before = json.load(file)
+    with open(args.after) as file:
+        after = json.load(file)
+    compare(before, after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""벤치마크용 가상 가계부 데이터를 SQLite 파일로 생성합니다.
+
+같은 --seed로 실행하면 같은 데이터가 생성되므로 커밋 사이의 결과를 비교할 수 있습니다.
+사용자 이름은 bench0, bench1, ... 이며 비밀번호는 모두 --password 값입니다. aco-book-server 디렉터리에서 실행합니다.
+
+    python -m benchmarks.ledger --path ./bench.db --users 20 --records 2000000
+"""
+import argparse
+import os
+import random
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.auth import hash_password
+from app.balances import rebuild
+from app.config import settings
+from app.database import Asset, AssetRecord, Currency, User, UserGroup, UserGroupRelation
+from app.database.database import AssetType, Database
+
+CATEGORIES = [
+    "식비", "카페", "커피", "교통", "주유", "월세", "관리비", "통신비", "보험", "병원", "약국", "쇼핑", "온라인 쇼핑",
+    "급여", "상여", "이자", "배당", "환불", "Coffee Shop", "Grocery", "Restaurant", "Subscription", "Travel", "Gift",
+]
+CHUNK_SIZE = 10000
+
+
+@dataclass
+class LedgerSpec:
+    users: int = 10
+    # 각 사용자는 기본 그룹 하나와, shared_group_size명씩 묶인 공유 그룹에 속함
+    shared_group_size: int = 3
+    assets_per_group: int = 4
+    records: int = 1000000
+    years: int = 5
+    password: str = "bench"
+    seed: int = 1
+
+
+def iter_record_chunks(rng: random.Random, asset_ids: List[int], spec: LedgerSpec) -> Iterator[List[Dict[str, Any]]]:
+    start = datetime(2020, 1, 1)
+    span = int(timedelta(days=365 * spec.years).total_seconds())
+    for offset in range(0, spec.records, CHUNK_SIZE):
+        chunk = []
+        for _ in range(min(CHUNK_SIZE, spec.records - offset)):
+            amount = round(rng.lognormvariate(9, 1.2), 0) * (1 if rng.random() < 0.15 else -1)
+            chunk.append(
+                {
+                    "asset_id": rng.choice(asset_ids),
+                    "date": start + timedelta(seconds=rng.randrange(span)),
+                    "category": rng.choice(CATEGORIES),
+                    "payment_amount": amount,
+                    "currency": Currency.USD if rng.random() < 0.05 else Currency.KRW,
+                    "approved_amount": amount,
+                }
+            )
+        yield chunk
+
+
+def generate(path: str, spec: LedgerSpec) -> Dict[str, Any]:
+    """path에 새 SQLite DB를 만들고 spec에 따라 데이터를 채웁니다. 기존 파일은 지웁니다."""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    began = time.perf_counter()
+    rng = random.Random(spec.seed)
+    database = Database(replace(settings, database_url=None, sqlite_path=path))
+    database.create_tables()
+    password_hash = hash_password(spec.password)
+
+    with Session(bind=database.engine) as session:
+        users = [
+            User(username=f"bench{i}", password=password_hash, email=f"bench{i}@example.com", full_name=f"bench {i}", nickname=f"bench{i}")
+            for i in range(spec.users)
+        ]
+        session.add_all(users)
+        session.flush()
+
+        groups = []
+        for user in users:
+            group = UserGroup(name=f"default_{user.username}", admin=user.id)
+            groups.append((group, [user]))
+        for start in range(0, spec.users, spec.shared_group_size):
+            members = users[start:start + spec.shared_group_size]
+            groups.append((UserGroup(name=f"shared_{start}", admin=members[0].id), members))
+        session.add_all(group for group, _ in groups)
+        session.flush()
+
+        session.add_all(
+            UserGroupRelation(user_id=user.id, group_id=group.id, approved=True) for group, members in groups for user in members
+        )
+        assets = [
+            Asset(
+                owner_group_id=group.id,
+                name=f"{group.name} asset {i}",
+                asset_type=rng.choice(list(AssetType)),
+                currency=Currency.KRW,
+            )
+            for group, _ in groups
+            for i in range(spec.assets_per_group)
+        ]
+        session.add_all(assets)
+        session.commit()
+        asset_ids = [asset.id for asset in assets]
+
+        for chunk in iter_record_chunks(rng, asset_ids, spec):
+            session.execute(insert(AssetRecord), chunk)
+        session.commit()
+        rebuild(session)
+
+    database.dispose()
+    return {
+        "path": path,
+        "users": spec.users,
+        "groups": len(groups),
+        "assets": len(asset_ids),
+        "records": spec.records,
+        "seed": spec.seed,
+        "seconds": round(time.perf_counter() - began, 3),
+        "bytes": os.path.getsize(path),
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = LedgerSpec()
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--shared-group-size", type=int, default=defaults.shared_group_size)
+    parser.add_argument("--assets-per-group", type=int, default=defaults.assets_per_group)
+    parser.add_argument("--records", type=int, default=defaults.records)
+    parser.add_argument("--years", type=int, default=defaults.years)
+    parser.add_argument("--password", default=defaults.password)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def spec_from_args(args: argparse.Namespace) -> LedgerSpec:
+    return LedgerSpec(
+        users=args.users,
+        shared_group_size=args.shared_group_size,
+        assets_per_group=args.assets_per_group,
+        records=args.records,
+        years=args.years,
+        password=args.password,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", default="./bench.db")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    summary = generate(args.path, spec_from_args(args))
+    print(", ".join(f"{key}={value}" for key, value in summary.items()))
+
+
+if __name__ == "__main__":
+    main()
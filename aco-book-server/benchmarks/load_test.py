@@ -0,0 +1,104 @@
+"""실행 중인 서버에 동시 요청을 보내 처리량과 지연 시간을 측정합니다.
+
+서버를 띄운 뒤 aco-book-server 디렉터리에서 실행합니다. 비교하려는 두 커밋에서 같은 옵션으로 실행해 결과를 비교합니다.
+데이터 생성부터 결과 파일 저장까지 한 번에 실행하려면 benchmarks.suite를 사용합니다.
+
+    uvicorn app:app --port 8000
+    python -m benchmarks.load_test --username bench --password bench --path /records/ --path /assets/ --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import httpx
+
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    path: str
+    json: Optional[Dict[str, Any]] = None
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> None:
+    response = await client.post("/token/", json={"username": username, "password": password})
+    response.raise_for_status()
+    # 로그인 쿠키는 secure로 설정되므로 http 환경에서도 보내도록 직접 지정
+    client.cookies.set("token", client.cookies.get("token"))
+
+
+async def worker(
+    client: httpx.AsyncClient, scenarios: List[Scenario], count: int, latencies: List[float], errors: Dict[int, int]
+) -> None:
+    for i in range(count):
+        scenario = scenarios[i % len(scenarios)]
+        began = time.perf_counter()
+        response = await client.request(scenario.method, scenario.path, json=scenario.json)
+        await response.aread()
+        latencies.append(time.perf_counter() - began)
+        if response.status_code >= 400:
+            errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+
+def summarize(latencies: List[float], elapsed: float, errors: Dict[int, int]) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+        "errors": {str(status): count for status, count in errors.items()},
+    }
+
+
+async def run_scenarios(client: httpx.AsyncClient, scenarios: List[Scenario], concurrency: int, requests: int) -> Dict[str, Any]:
+    """scenarios를 번갈아 concurrency개의 동시 작업으로 총 requests번 요청하고 지연 시간 통계를 반환합니다."""
+    latencies: List[float] = []
+    errors: Dict[int, int] = {}
+    per_worker = max(1, requests // concurrency)
+    began = time.perf_counter()
+    await asyncio.gather(*(worker(client, scenarios, per_worker, latencies, errors) for _ in range(concurrency)))
+    result = summarize(latencies, time.perf_counter() - began, errors)
+    result["concurrency"] = concurrency
+    return result
+
+
+async def run(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        if args.username:
+            await login(client, args.username, args.password)
+
+        scenarios = [Scenario(path, "GET", path) for path in args.path]
+        result = await run_scenarios(client, scenarios, args.concurrency, args.requests)
+
+    print(f"requests     {result['requests']}")
+    print(f"concurrency  {result['concurrency']}")
+    print(f"throughput   {result['throughput_rps']:,.1f} req/s")
+    print(f"latency p50  {result['p50_ms']:.1f} ms")
+    print(f"latency p95  {result['p95_ms']:.1f} ms")
+    print(f"latency p99  {result['p99_ms']:.1f} ms")
+    print(f"errors       {result['errors'] or 'none'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    parser.add_argument("--path", action="append", help="GET로 요청할 경로. 여러 번 지정하면 번갈아 요청")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+    args.path = args.path or ["/records/"]
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
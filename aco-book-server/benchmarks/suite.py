@@ -0,0 +1,212 @@
+"""가상 데이터 생성부터 API 부하 측정까지 한 번에 실행하고 결과를 JSON 파일로 저장합니다.
+
+1. benchmarks.ledger로 --db 경로에 SQLite 파일을 새로 만듭니다(--reuse이면 기존 파일 사용).
+2. asgi: 새 자식 프로세스에서 httpx의 ASGI transport로 실제 FastAPI 앱을 호출합니다(네트워크 없이 앱 자체의 비용).
+   데이터 생성에 사용한 메모리가 최대 RSS에 섞이지 않도록 자식 프로세스에서 실행합니다.
+3. uvicorn: 로컬 uvicorn 서버를 띄우고 HTTP로 호출합니다.
+
+시나리오마다 p50/p95/p99 지연 시간과 처리량을, 모드마다 최대 RSS를 기록합니다.
+결과 파일에는 커밋 해시가 들어가며, 두 커밋의 결과는 benchmarks.compare로 비교합니다. aco-book-server 디렉터리에서 실행합니다.
+
+    python -m benchmarks.suite --records 2000000 --requests 2000 --concurrency 20
+    python -m benchmarks.compare bench-abc1234.json bench-def5678.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from .load_test import Scenario, login, run_scenarios
+
+
+def build_scenarios(username: str, password: str) -> List[Tuple[Scenario, float]]:
+    """(시나리오, --requests에 곱할 비율) 목록입니다. 비용이 큰 로그인과 내보내기는 요청 수를 줄입니다."""
+    return [
+        (Scenario("records", "GET", "/records/?limit=100"), 1.0),
+        (Scenario("records_limit_1000", "GET", "/records/?limit=1000"), 0.2),
+        (Scenario("records_columnar_1000", "GET", "/records/?limit=1000&format=columnar"), 0.2),
+        (Scenario("assets", "GET", "/assets/"), 1.0),
+        (Scenario("groups", "GET", "/groups/"), 1.0),
+        (Scenario("login", "POST", "/token/", {"username": username, "password": password}), 0.05),
+        (Scenario("export_csv", "GET", "/records/export?format=csv&start_date=2024-07-01"), 0.005),
+    ]
+
+
+async def run_all(client: httpx.AsyncClient, args: argparse.Namespace) -> Dict[str, Any]:
+    await login(client, args.username, args.password)
+    results = {}
+    for scenario, ratio in build_scenarios(args.username, args.password):
+        if args.scenario and scenario.name not in args.scenario:
+            continue
+        requests = max(1, int(args.requests * ratio))
+        concurrency = min(args.concurrency, requests)
+        results[scenario.name] = await run_scenarios(client, [scenario], concurrency, requests)
+        print(f"  {scenario.name:<24} {results[scenario.name]['throughput_rps']:10,.1f} req/s  p95 {results[scenario.name]['p95_ms']:8.1f} ms")
+    return results
+
+
+def self_peak_rss() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def process_peak_rss(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+async def run_asgi(args: argparse.Namespace) -> Dict[str, Any]:
+    """--asgi-child로 실행된 자식 프로세스에서 호출됩니다."""
+    from app import app
+    from app.database import db
+
+    # ASGI transport는 lifespan을 실행하지 않으므로 직접 준비
+    db.create_tables()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=args.timeout) as client:
+        results = await run_all(client, args)
+    db.dispose()
+    return {"scenarios": results, "peak_rss_bytes": self_peak_rss()}
+
+
+async def run_asgi_child(args: argparse.Namespace) -> Dict[str, Any]:
+    command = [
+        sys.executable, "-m", "benchmarks.suite", "--asgi-child",
+        "--db", args.db,
+        "--password", args.password,
+        "--requests", str(args.requests),
+        "--concurrency", str(args.concurrency),
+        "--timeout", str(args.timeout),
+    ]
+    for name in args.scenario or []:
+        command += ["--scenario", name]
+    process = await asyncio.create_subprocess_exec(*command, env=os.environ.copy(), stdout=asyncio.subprocess.PIPE)
+    stdout, _ = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"ASGI benchmark exited with code {process.returncode}")
+    *progress, result = stdout.decode().rstrip().splitlines()
+    for line in progress:
+        print(line)
+    return json.loads(result)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            # /status/database는 DB가 응답할 때만 200을 반환
+            if (await client.get("/status/database")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn did not start in time")
+
+
+async def run_uvicorn(args: argparse.Namespace) -> Dict[str, Any]:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=args.timeout) as client:
+            await wait_until_ready(client, server, args.timeout)
+            results = await run_all(client, args)
+        return {"scenarios": results, "peak_rss_bytes": process_peak_rss(server.pid)}
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def git_commit() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def main() -> None:
+    pre = argparse.ArgumentParser(add_help=False)
+    pre.add_argument("--db", default="./bench.db", help="생성하거나 재사용할 SQLite 파일")
+    known, _ = pre.parse_known_args()
+    # app.config.settings는 import 시점의 환경 변수를 읽으므로 app을 import하기 전에 DB 경로를 지정
+    os.environ["ACO_SQLITE_PATH"] = os.path.abspath(known.db)
+    os.environ.pop("ACO_DATABASE_URL", None)
+
+    from . import ledger
+
+    parser = argparse.ArgumentParser(parents=[pre])
+    ledger.add_arguments(parser)
+    parser.add_argument("--reuse", action="store_true", help="--db 파일이 있으면 새로 만들지 않음")
+    parser.add_argument("--mode", action="append", choices=["asgi", "uvicorn"], help="기본값은 두 모드 모두")
+    parser.add_argument("--scenario", action="append", help="실행할 시나리오 이름. 기본값은 전체")
+    parser.add_argument("--requests", type=int, default=2000, help="시나리오당 기준 요청 수")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="결과 파일. 기본값은 bench-<커밋>.json")
+    parser.add_argument("--asgi-child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.username = "bench0"
+
+    if args.asgi_child:
+        print(json.dumps(asyncio.run(run_asgi(args))))
+        return
+
+    spec = ledger.spec_from_args(args)
+    if args.reuse and os.path.exists(args.db):
+        ledger_summary: Dict[str, Any] = {"path": args.db, "reused": True}
+    else:
+        print(f"generating {spec.records:,} records into {args.db}")
+        ledger_summary = ledger.generate(args.db, spec)
+
+    report: Dict[str, Any] = {
+        **git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {"requests": args.requests, "concurrency": args.concurrency},
+        "ledger": ledger_summary,
+        "modes": {},
+    }
+    for mode in args.mode or ["asgi", "uvicorn"]:
+        print(f"{mode}:")
+        runner = run_asgi_child if mode == "asgi" else run_uvicorn
+        report["modes"][mode] = asyncio.run(runner(args))
+
+    output = args.output or f"bench-{(report['commit'] or 'unknown')[:7]}.json"
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
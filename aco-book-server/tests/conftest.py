@@ -0,0 +1,50 @@
+"""API 테스트 공통 설정입니다. benchmarks.ledger로 만든 작은 가상 가계부를 임시 SQLite 파일에 두고 실제 앱으로 요청합니다.
+
+aco-book-server 디렉터리에서 개발용 의존성을 설치한 뒤 실행합니다.
+
+    pip install -r requirements-dev.in
+    python -m pytest tests
+"""
+import os
+import tempfile
+
+# app.config.settings는 import 시점의 환경 변수를 읽으므로 app을 import하기 전에 지정
+os.environ["ACO_SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ.pop("ACO_DATABASE_URL", None)
+os.environ["ACO_PASSWORD_SCHEME"] = "pbkdf2_sha256"
+os.environ["ACO_PBKDF2_ITERATIONS"] = "1000"
+# 쿼리 한도를 넘은 라우트는 QueryBudgetExceeded로 테스트가 실패하도록 함
+os.environ["ACO_QUERY_BUDGET_MODE"] = "raise"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from app.config import settings
+from benchmarks.ledger import LedgerSpec, generate
+
+PASSWORD = "password"
+
+
+@pytest.fixture(scope="session")
+def ledger():
+    return generate(settings.sqlite_path, LedgerSpec(users=3, records=500, password=PASSWORD))
+
+
+@pytest.fixture(scope="session")
+def client(ledger):
+    with TestClient(app) as client:
+        yield client
+
+
+def login(client: TestClient, username: str = "bench0") -> None:
+    response = client.post("/token/", json={"username": username, "password": PASSWORD})
+    response.raise_for_status()
+    # 로그인 쿠키는 secure로 설정되므로 http 테스트 클라이언트에서도 보내도록 직접 지정
+    client.cookies.set("token", response.cookies["token"])
+
+
+@pytest.fixture
+def user_client(client):
+    login(client)
+    return client
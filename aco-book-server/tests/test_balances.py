@@ -0,0 +1,36 @@
+from sqlalchemy.orm import Session
+
+from app.balances import verify
+from app.database import AssetBalance, db
+
+
+def balance_of(client, asset_id):
+    return next(row for row in client.get("/summary/balances").json()["data"] if row["asset_id"] == asset_id)
+
+
+def test_create_record_applies_balance_delta(user_client):
+    asset_id = user_client.get("/assets/").json()["data"][0]["id"]
+    before = balance_of(user_client, asset_id)
+
+    response = user_client.post(
+        "/records/", json={"asset_id": asset_id, "date": "2024-03-15", "payment_amount": -1234, "currency": "KRW", "category": "test"}
+    )
+    assert response.status_code == 200
+
+    after = balance_of(user_client, asset_id)
+    assert after["balance"] == before["balance"] - 1234
+    assert after["record_count"] == before["record_count"] + 1
+    with Session(db.engine) as session:
+        assert verify(session) == []
+
+
+def test_verify_reports_drifted_balances(ledger):
+    with Session(db.engine) as session:
+        assert verify(session) == []
+        balance = session.query(AssetBalance).first()
+        asset_id = balance.asset_id
+        balance.balance += 1
+        session.flush()
+        problems = verify(session)
+        session.rollback()
+    assert len(problems) == 1 and problems[0].startswith(f"asset {asset_id}:")
@@ -0,0 +1,30 @@
+from app.config import settings
+
+
+def test_metrics_requires_token(client, monkeypatch):
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(settings, "metrics_token", "secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+    assert "aco_http_request_duration_seconds" in response.text
+
+
+def test_unknown_methods_share_one_label(client, monkeypatch):
+    for method in ("FOO", "BAR"):
+        client.request(method, "/no-such-path")
+
+    monkeypatch.setattr(settings, "metrics_token", "secret")
+    text = client.get("/metrics", headers={"Authorization": "Bearer secret"}).text
+    assert 'method="OTHER",route="<unmatched>"' in text
+    assert 'method="FOO"' not in text and 'method="BAR"' not in text
+
+
+def test_database_status_is_plain_health(client, monkeypatch):
+    assert client.get("/status/database").json() == {"status": "ok"}
+
+    monkeypatch.setattr(settings, "metrics_token", "secret")
+    text = client.get("/metrics", headers={"Authorization": "Bearer secret"}).text
+    assert "aco_db_pool_" in text
@@ -0,0 +1,126 @@
+import subprocess
+import sys
+
+from sqlalchemy import create_engine, inspect, select, text
+
+from app import migrations
+from app.database import AssetBalance
+from app.database.database import Base
+
+# baseline 커밋의 모델로 create_all을 실행했을 때 SQLite에 만들어지는 스키마
+BASELINE_SCHEMA = [
+    """CREATE TABLE users (
+        id INTEGER NOT NULL, username VARCHAR, password VARCHAR, email VARCHAR, full_name VARCHAR, nickname VARCHAR,
+        PRIMARY KEY (id), UNIQUE (email)
+    )""",
+    "CREATE INDEX ix_users_password ON users (password)",
+    "CREATE INDEX ix_users_id ON users (id)",
+    "CREATE UNIQUE INDEX ix_users_username ON users (username)",
+    """CREATE TABLE user_groups (
+        id INTEGER NOT NULL, name VARCHAR, admin INTEGER NOT NULL,
+        PRIMARY KEY (id), UNIQUE (name), FOREIGN KEY(admin) REFERENCES users (id)
+    )""",
+    """CREATE TABLE financial_records (
+        id INTEGER NOT NULL, date DATETIME NOT NULL, user_id INTEGER NOT NULL, category VARCHAR, detail VARCHAR, asset VARCHAR,
+        payment_amount FLOAT NOT NULL, currency VARCHAR(3), approved_amount FLOAT, note VARCHAR,
+        PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id)
+    )""",
+    "CREATE INDEX ix_financial_records_id ON financial_records (id)",
+    """CREATE TABLE user_group_relations (
+        id INTEGER NOT NULL, user_id INTEGER NOT NULL, group_id INTEGER NOT NULL, approved BOOLEAN,
+        PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id), FOREIGN KEY(group_id) REFERENCES user_groups (id)
+    )""",
+    """CREATE TABLE assets (
+        id INTEGER NOT NULL, owner_group_id INTEGER NOT NULL, name VARCHAR, asset_type VARCHAR(18), currency VARCHAR(3),
+        PRIMARY KEY (id), FOREIGN KEY(owner_group_id) REFERENCES user_groups (id)
+    )""",
+    """CREATE TABLE asset_records (
+        id INTEGER NOT NULL, asset_id INTEGER NOT NULL, date DATETIME NOT NULL, category VARCHAR, payment_amount FLOAT NOT NULL,
+        currency VARCHAR(3), approved_amount FLOAT,
+        PRIMARY KEY (id), FOREIGN KEY(asset_id) REFERENCES assets (id)
+    )""",
+]
+
+
+def baseline_engine(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql("INSERT INTO users (id, username) VALUES (1, 'user')")
+        connection.exec_driver_sql("INSERT INTO user_groups (id, name, admin) VALUES (1, 'group', 1)")
+        connection.exec_driver_sql("INSERT INTO assets (id, owner_group_id, name, asset_type, currency) VALUES (1, 1, 'cash', 'CASH', 'KRW')")
+        connection.exec_driver_sql(
+            "INSERT INTO asset_records (asset_id, date, category, payment_amount, currency, approved_amount) VALUES "
+            "(1, '2024-01-01 00:00:00', 'food', -300, 'KRW', -300), (1, '2024-02-01 00:00:00', 'salary', 1000, 'KRW', 1000)"
+        )
+    return engine
+
+
+def describe_schema(engine, exclude=()):
+    inspector = inspect(engine)
+    schema = {}
+    for table in sorted(set(inspector.get_table_names()) - set(exclude)):
+        schema[table] = {
+            "columns": [(c["name"], str(c["type"]), c["nullable"]) for c in inspector.get_columns(table)],
+            "primary_key": inspector.get_pk_constraint(table)["constrained_columns"],
+            "indexes": sorted((i["name"], tuple(i["column_names"]), bool(i["unique"])) for i in inspector.get_indexes(table)),
+            "unique": sorted(tuple(u["column_names"]) for u in inspector.get_unique_constraints(table)),
+            "foreign_keys": sorted(
+                (tuple(f["constrained_columns"]), f["referred_table"], tuple(f["referred_columns"])) for f in inspector.get_foreign_keys(table)
+            ),
+        }
+    return schema
+
+
+def test_baseline_and_fresh_databases_upgrade_to_the_same_schema(tmp_path):
+    fresh = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    migrations.upgrade(fresh)
+    old = baseline_engine(tmp_path / "old.db")
+    assert [migration.version for migration in migrations.upgrade(old)] == [m.version for m in migrations.MIGRATIONS]
+    assert describe_schema(old) == describe_schema(fresh)
+
+    # 마이그레이션의 결과가 현재 모델과 같아야 함
+    models = create_engine(f"sqlite:///{tmp_path / 'models.db'}")
+    Base.metadata.create_all(models)
+    generated = [table for table in inspect(fresh).get_table_names() if table.startswith("asset_records_fts")]
+    assert describe_schema(fresh, exclude=["schema_migrations", *generated]) == describe_schema(models)
+    for engine in (fresh, old, models):
+        engine.dispose()
+
+
+def test_upgrade_from_baseline_backfills_existing_records(tmp_path):
+    engine = baseline_engine(tmp_path / "old.db")
+    migrations.upgrade(engine)
+    with engine.connect() as connection:
+        assert connection.execute(select(AssetBalance.balance, AssetBalance.record_count)).one() == (700, 2)
+        assert connection.execute(text("SELECT count(*) FROM asset_records WHERE updated_at IS NULL")).scalar() == 0
+        assert connection.execute(text("SELECT rowid FROM asset_records_fts WHERE asset_records_fts MATCH 'food'")).scalars().all() == [1]
+    engine.dispose()
+
+
+def test_concurrent_upgrades_apply_each_migration_once(tmp_path):
+    path = tmp_path / "fresh.db"
+    script = (
+        "import sys\n"
+        "from sqlalchemy import create_engine\n"
+        "from app import migrations\n"
+        "engine = create_engine(f'sqlite:///{sys.argv[1]}', connect_args={'timeout': 0.1})\n"
+        "print(len(migrations.upgrade(engine)))\n"
+    )
+    workers = [
+        subprocess.Popen([sys.executable, "-c", script, str(path)], stdout=subprocess.PIPE, text=True) for _ in range(4)
+    ]
+    applied = []
+    for worker in workers:
+        stdout, _ = worker.communicate(timeout=120)
+        assert worker.returncode == 0
+        applied.append(int(stdout))
+
+    # 한 워커만 전부 적용하고 나머지는 잠금을 기다린 뒤 아무것도 적용하지 않음
+    assert sorted(applied) == [0, 0, 0, migrations.LATEST_VERSION]
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.connect() as connection:
+        versions = connection.execute(select(migrations.schema_migrations.c.version)).scalars().all()
+    assert sorted(versions) == [migration.version for migration in migrations.MIGRATIONS]
+    engine.dispose()
@@ -0,0 +1,25 @@
+from sqlalchemy.orm import Session
+
+from app.database import UserGroupRelation, db
+from app.permissions import get_user_permissions
+from app.query_budget import assert_max_queries
+
+
+def test_permissions_are_resolved_once_per_session(ledger):
+    with Session(db.engine) as session:
+        with assert_max_queries(1):
+            permissions = get_user_permissions(session, 1)
+            assert get_user_permissions(session, 1) is permissions
+        group_id = min(permissions.group_ids)
+
+    # 다른 워커의 요청이 그룹에서 뺀 것처럼 다른 세션에서 소속을 지움
+    with Session(db.engine) as session:
+        relation = session.query(UserGroupRelation).filter_by(user_id=1, group_id=group_id).one()
+        session.delete(relation)
+        session.commit()
+        try:
+            with Session(db.engine) as request:
+                assert not get_user_permissions(request, 1).is_member(group_id)
+        finally:
+            session.add(UserGroupRelation(user_id=1, group_id=group_id, approved=True))
+            session.commit()
@@ -0,0 +1,38 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.database import db
+from app.query_budget import QueryBudget, QueryBudgetExceeded, QueryBudgetMiddleware, count_queries
+
+
+def test_records_list_stays_within_budget(user_client):
+    with count_queries() as log:
+        response = user_client.get("/records/?limit=100")
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 100
+    assert 0 < log.count <= 10
+
+
+def test_delete_records_stays_within_budget(user_client):
+    ids = [row["id"] for row in user_client.get("/records/?limit=50").json()["data"]]
+    with count_queries() as log:
+        response = user_client.request("DELETE", "/records/", json={"id": ids})
+    assert response.status_code == 200
+    assert 0 < log.count <= 15
+    assert not set(ids) & {row["id"] for row in user_client.get("/records/?limit=1000").json()["data"]}
+
+
+def test_route_over_budget_raises():
+    app = FastAPI()
+
+    @app.get("/", dependencies=[Depends(QueryBudget(1))])
+    def run_two_queries():
+        with db.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+        return {}
+
+    with pytest.raises(QueryBudgetExceeded, match="ran 2 queries"):
+        TestClient(QueryBudgetMiddleware(app, mode="raise")).get("/")
@@ -0,0 +1,79 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import AssetRecord, db
+from app.routers.records import RecordFilterSchema, filter_records, paginate_records
+from app.serializers import get_serializer
+from app.utils import encode_cursor
+
+
+def first_asset_id(client) -> int:
+    return client.get("/assets/").json()["data"][0]["id"]
+
+
+def test_bulk_rejects_unknown_currency(user_client):
+    asset_id = first_asset_id(user_client)
+    response = user_client.post(
+        "/records/bulk",
+        json=[
+            {"asset_id": asset_id, "payment_amount": -1000, "currency": "KRW", "category": "test"},
+            {"asset_id": asset_id, "payment_amount": -1000, "currency": "XXX", "category": "test"},
+        ],
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["inserted"] == 1
+    assert [error["index"] for error in body["errors"]] == [1]
+
+    assert user_client.get("/records/?stream=ndjson").status_code == 200
+    assert user_client.get("/sync").status_code == 200
+
+
+def test_import_rejects_unknown_currency(user_client):
+    asset_id = first_asset_id(user_client)
+    content = (
+        "asset_id,date,category,payment_amount,currency\n"
+        f"{asset_id},2024-01-02T00:00:00,import,-500,KRW\n"
+        f"{asset_id},2024-01-03T00:00:00,import,-500,KWR\n"
+    )
+    response = user_client.post("/records/import", files={"file": ("records.csv", content, "text/csv")})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["inserted"] == 1
+    assert len(body["errors"]) == 1
+    assert "KWR" in body["errors"][0]["detail"]
+
+
+def test_export_rejects_missing_source_currency_rates(user_client):
+    # 가상 가계부에는 USD 기록이 있지만 환율은 없음
+    response = user_client.get("/records/export?format=csv&currency=KRW")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "No exchange rate for USD"
+
+
+@pytest.mark.parametrize("path", ["/records/export?format=csv&currency=XXX", "/summary/balances?currency=XXX"])
+def test_unknown_target_currency_is_a_validation_error(user_client, path):
+    response = user_client.get(path)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown currency XXX"
+
+
+@pytest.mark.parametrize(
+    "filters, cursor",
+    [
+        (RecordFilterSchema(), None),
+        (RecordFilterSchema(), encode_cursor(datetime(2024, 6, 1), 100)),
+        (RecordFilterSchema(start_date="2024-01-01"), encode_cursor(datetime(2024, 6, 1), 100)),
+    ],
+)
+def test_records_page_reads_in_index_order(ledger, filters, cursor):
+    # 자산마다 기록을 찾아 정렬하면 페이지마다 사용자의 모든 기록을 읽으므로 (date, id) 인덱스를 순서대로 읽어야 함
+    with Session(db.engine) as session:
+        query = filter_records(session.query(*get_serializer(AssetRecord).select_columns), 1, filters, use_asset_index=False)
+        statement = paginate_records(query, cursor, 100).statement.compile(db.engine, compile_kwargs={"literal_binds": True})
+        plan = [row[3] for row in session.execute(text(f"EXPLAIN QUERY PLAN {statement}"))]
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+    assert any("ix_asset_records_date_id" in step for step in plan), plan
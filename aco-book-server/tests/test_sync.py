@@ -0,0 +1,35 @@
+def test_initial_sync_pages_records_with_cursor(user_client):
+    full = user_client.get("/sync?limit=10000").json()
+    assert full["has_more"] is False and full["next_since"] is not None
+    expected = [row["id"] for row in full["records"]["data"]]
+    assert len(expected) > 100
+
+    pages = [user_client.get("/sync?limit=100").json()]
+    while pages[-1]["has_more"]:
+        assert pages[-1]["next_since"] is None
+        pages.append(user_client.get(f"/sync?limit=100&cursor={pages[-1]['next_cursor']}").json())
+
+    assert [row["id"] for page in pages for row in page["records"]["data"]] == expected
+    assert all(len(page["records"]["data"]) <= 100 for page in pages)
+    # 자산과 그룹은 첫 페이지에만 들어 있음
+    assert pages[0]["assets"]["data"] == full["assets"]["data"]
+    assert all(page["assets"]["data"] == [] and page["groups"]["data"] == [] for page in pages[1:])
+    assert pages[-1]["next_since"] is not None
+
+
+def test_sync_rejects_invalid_cursor(user_client):
+    assert user_client.get("/sync?cursor=not-a-cursor").status_code == 400
+
+
+def test_delete_group_records_tombstones_for_members(user_client):
+    since = user_client.get("/sync?limit=1").json()
+    while since["has_more"]:
+        since = user_client.get(f"/sync?limit=1000&cursor={since['next_cursor']}").json()
+
+    assert user_client.post("/groups/", json={"name": "short-lived group"}).status_code == 200
+    group_id = next(group["id"] for group in user_client.get("/groups/").json()["data"] if group["name"] == "short-lived group")
+    assert user_client.request("DELETE", "/groups/", json={"id": [group_id]}).status_code == 200
+
+    changes = user_client.get("/sync", params={"since": since["next_since"]}).json()
+    assert group_id in changes["groups"]["deleted"]
+    assert group_id not in [group["id"] for group in changes["groups"]["data"]]
@@ -0,0 +1,33 @@
+from sqlalchemy.orm import Session
+
+from app.database import Asset, db
+from app.versions import bump_group_versions
+
+
+def test_etag_changes_only_when_data_changes(user_client):
+    response = user_client.get("/records/?limit=10")
+    etag = response.headers["ETag"]
+    assert user_client.get("/records/?limit=10", headers={"If-None-Match": etag}).status_code == 304
+
+    asset_id = user_client.get("/assets/").json()["data"][0]["id"]
+    user_client.post("/records/bulk", json=[{"asset_id": asset_id, "payment_amount": -1, "currency": "KRW"}])
+
+    response = user_client.get("/records/?limit=10", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert user_client.get("/records/?limit=10", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_foreign_sublist_drops_assets_deleted_by_another_worker(user_client):
+    group_id = user_client.get("/groups/").json()["data"][0]["id"]
+    user_client.post("/assets/", json={"name": "short-lived", "asset_type": "CASH", "currency": "KRW", "owner_group_id": group_id})
+    assert "short-lived" in user_client.get("/records/?limit=1").json()["dtypes"]["asset_id"]
+
+    # 다른 워커가 삭제한 것처럼 이 프로세스의 캐시를 건드리지 않고 DB에서만 삭제
+    with Session(db.engine) as session:
+        asset = session.query(Asset).filter_by(name="short-lived").one()
+        session.delete(asset)
+        bump_group_versions(session, [group_id], "assets", "records")
+        session.commit()
+
+    assert "short-lived" not in user_client.get("/records/?limit=1").json()["dtypes"]["asset_id"]